@@ -134,6 +134,12 @@ class Config:
             'end': '15:20'
         }
     }
+    
+    # ========================================================================
+    # 자주 참조하는 설정값 별칭 (읽기 전용, 루프 내 중첩 딕셔너리 조회 방지)
+    # ========================================================================
+    STOP_LOSS_PCT = TRADING_STRATEGY['sell_conditions']['stop_loss_percent']
+    REQUEST_DELAY = API_SETTINGS['request_delay']
 
 # ============================================================================
 # 설정 검증 함수
@@ -170,10 +176,20 @@ def validate_config():
 # ============================================================================
 # 설정 로드 함수
 # ============================================================================
+_validated_config = None  # 검증을 통과한 설정 클래스 (최초 호출 시 설정)
+
 def get_config():
-    """설정 객체 반환 (검증 포함)"""
-    validate_config()
-    return Config
+    """설정 객체 반환 (최초 1회만 검증)"""
+    global _validated_config
+    if _validated_config is None:
+        validate_config()
+        _validated_config = Config
+    return _validated_config
+
+def invalidate_config():
+    """검증 캐시 초기화 (설정값 변경 후 재검증이 필요할 때 사용)"""
+    global _validated_config
+    _validated_config = None
 
 if __name__ == "__main__":
     # 설정 검증 테스트
@@ -0,0 +1,161 @@
+# indicators.py - 이동평균/표준편차/최소값 NumPy 계산 함수
+# ============================================================================
+# kiwoom_api(분봉 지표)와 strategy(매수 조건)가 함께 사용한다.
+# 결과의 앞쪽 구간은 pandas rolling과 동일하게 NaN으로 채운다.
+
+import numpy as np
+
+
+def rolling_mean(values, period, out=None):
+    """누적합 기반 단순 이동평균 (앞쪽 period-1개 구간은 NaN)
+
+    out이 주어지면 새 배열을 만들지 않고 해당 배열에 결과를 기록한다.
+    """
+    mean = np.empty(len(values)) if out is None else out
+    mean[:period - 1] = np.nan
+    if len(values) < period:
+        return mean
+
+    # 누적합이 커지며 생기는 반올림 오차를 줄이기 위해 평균을 빼고 누적
+    # (NaN은 0으로 누적하고, NaN이 포함된 구간은 마지막에 NaN 처리)
+    shift = _finite_mean(values)
+    csum = np.concatenate(([0.0], np.cumsum(np.nan_to_num(values - shift))))
+    np.subtract(csum[period:], csum[:-period], out=mean[period - 1:])
+    mean[period - 1:] /= period
+    mean[period - 1:] += shift
+
+    # 구간 안의 값이 모두 같으면 누적합 오차 없이 그 값 그대로 (pandas와 동일)
+    flat = _flat_windows(values, period)
+    mean[period - 1:][flat] = values[period - 1:][flat]
+    mean[period - 1:][_nan_windows(values, period)] = np.nan
+    return mean
+
+
+def _finite_mean(values):
+    """NaN을 제외한 평균 (모두 NaN이면 0, 누적합 기준값으로 사용)"""
+    finite = values[~np.isnan(values)]
+    return finite.mean() if len(finite) else 0.0
+
+
+def _nan_windows(values, period):
+    """길이 period인 각 구간에 NaN이 있는지 여부 (구간 끝 기준, n-period+1개)"""
+    nans = np.concatenate(([0], np.cumsum(np.isnan(values))))
+    return nans[period:] != nans[:len(values) - period + 1]
+
+
+def _flat_windows(values, period):
+    """길이 period인 각 구간의 값이 모두 같은지 여부 (구간 끝 기준, n-period+1개)"""
+    changes = np.concatenate(([0], np.cumsum(values[1:] != values[:-1])))
+    return changes[period - 1:] == changes[:len(values) - period + 1]
+
+
+def rolling_mean_std(values, period, out=None):
+    """누적합 한 번으로 이동평균과 표본 표준편차(ddof=1)를 함께 계산
+
+    앞쪽 period-1개 구간은 pandas rolling과 동일하게 NaN으로 채운다.
+    out=(mean, std) 배열이 주어지면 해당 배열에 결과를 기록한다.
+    """
+    n = len(values)
+    mean, std = (np.empty(n), np.empty(n)) if out is None else out
+    mean[:period - 1] = np.nan
+    std[:period - 1] = np.nan
+    if n < period:
+        return mean, std
+
+    # 상쇄 오차를 줄이기 위해 평균을 빼고 누적 (NaN은 0으로 누적)
+    shift = _finite_mean(values)
+    centered = np.nan_to_num(values - shift)
+    csum = np.concatenate(([0.0], np.cumsum(centered)))
+    csum2 = np.concatenate(([0.0], np.cumsum(centered * centered)))
+
+    s = csum[period:] - csum[:-period]
+    s2 = csum2[period:] - csum2[:-period]
+
+    window_mean = s / period
+    var = s2 / period - window_mean * window_mean
+
+    mean[period - 1:] = window_mean + shift
+
+    # 구간 안의 값이 모두 같으면 pandas와 동일하게 평균은 그 값, 표준편차는 정확히 0
+    flat = _flat_windows(values, period)
+    mean[period - 1:][flat] = values[period - 1:][flat]
+    if period > 1:
+        np.sqrt(np.maximum(var, 0) * (period / (period - 1)), out=std[period - 1:])
+        std[period - 1:][flat] = 0.0
+    else:
+        std[:] = np.nan  # 값 하나로는 표본 표준편차를 구할 수 없음 (pandas와 동일)
+
+    # NaN이 포함된 구간은 평균/표준편차 모두 NaN (pandas와 동일)
+    nan_windows = _nan_windows(values, period)
+    mean[period - 1:][nan_windows] = np.nan
+    std[period - 1:][nan_windows] = np.nan
+    return mean, std
+
+
+def rolling_min(values, window, min_periods=None, out=None):
+    """NaN을 건너뛰는 이동 최소값
+
+    min_periods는 pandas rolling과 같은 의미로, 구간 안의 NaN이 아닌 값이
+    그보다 적으면 NaN을 돌려준다 (기본값은 window).
+    """
+    if min_periods is None:
+        min_periods = window
+
+    n = len(values)
+    padded = np.concatenate((np.full(window - 1, np.nan), values))
+
+    # van Herk/Gil-Werman: window 크기 블록별 앞/뒤 누적 최소값으로 O(n) 계산
+    # (구간마다 window개를 다시 훑지 않음)
+    blocks = -(-len(padded) // window)
+    grid = np.full(blocks * window, np.nan)
+    grid[:len(padded)] = padded
+    grid = grid.reshape(blocks, window)
+    prefix = np.fmin.accumulate(grid, axis=1).ravel()
+    suffix = np.fmin.accumulate(grid[:, ::-1], axis=1)[:, ::-1].ravel()
+    result = np.fmin(suffix[:n], prefix[window - 1:window - 1 + n], out=out)
+
+    if min_periods > 1:
+        valid = np.concatenate(([0], np.cumsum(~np.isnan(padded))))
+        counts = valid[window:] - valid[:-window]
+        result[counts < min_periods] = np.nan
+    return result
+
+
+def test_indicators():
+    """pandas rolling 결과와 비교 (NaN이 섞인 입력, period=1 포함)"""
+    import pandas as pd
+
+    rng = np.random.default_rng(0)
+    cases = [
+        np.array([24.0, 25.0, 26.0, np.nan, 25.0, 26.0, 27.0, 28.0]),
+        np.array([np.nan, np.nan, 1.0, 2.0, 3.0]),
+        np.full(6, np.nan),
+        np.round(0.2 + np.cumsum(rng.normal(0, 0.002, 300)), 2),
+    ]
+    noisy = 0.2 + np.cumsum(rng.normal(0, 0.002, 300))
+    noisy[[10, 150]] = np.nan
+    cases.append(noisy)
+
+    for values in cases:
+        series = pd.Series(values)
+        for period in (1, 2, 3, 20):
+            expected_mean = series.rolling(period).mean().to_numpy()
+            expected_std = series.rolling(period).std().to_numpy()
+            mean, std = rolling_mean_std(values, period)
+            np.testing.assert_allclose(rolling_mean(values, period), expected_mean,
+                                       rtol=1e-9, atol=1e-12)
+            np.testing.assert_allclose(mean, expected_mean, rtol=1e-9, atol=1e-12)
+            np.testing.assert_allclose(std, expected_std, rtol=1e-6, atol=1e-8)
+
+        expected_min = series.rolling(3, min_periods=1).min().to_numpy()
+        np.testing.assert_array_equal(rolling_min(values, 3, min_periods=1), expected_min)
+
+    # NaN이 없는 구간은 pandas처럼 유한한 값 (전체가 NaN이 되지 않음)
+    mean = rolling_mean(np.array([np.nan, 24.0, 25.0, 26.0, 27.0, 28.0]), 3)
+    np.testing.assert_array_equal(mean[3:], [25.0, 26.0, 27.0])
+
+    print("✅ 지표 계산 테스트 완료")
+
+
+if __name__ == "__main__":
+    test_indicators()
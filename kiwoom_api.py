@@ -1,12 +1,134 @@
+import os
+import re
 import sys
 import time
+import pickle
+import queue
+import functools
+import threading
 import pandas as pd
+from PyQt5.QtCore import QEventLoop, QTimer
 from PyQt5.QtWidgets import QApplication
 from pykiwoom.kiwoom import Kiwoom
-from datetime import datetime, timedelta
+from concurrent.futures import Future
+from datetime import date, datetime, timedelta
 import numpy as np
+from config import Config
+from indicators import rolling_mean, rolling_mean_std, rolling_min
+
+CACHE_DIR = "cache"
+KRW_PER_POINT = 1000  # 키움 옵션 가격 단위 변환 (0.1포인트 = 100원)
+OPTION_CHAIN_MAX_AGE = 30 * 60  # 옵션 체인 캐시를 즉시 사용할 수 있는 최대 경과 시간 (초)
+
+# 옵션 구분 문자열 (intern 처리로 비교 시 포인터 비교 경로를 타도록 함)
+_CALL = sys.intern('CALL')
+_PUT = sys.intern('PUT')
+
+# TR 결과 필드명
+_FID_PRICE = sys.intern('현재가')
+_FID_BID = sys.intern('매수최우선호가')
+_FID_ASK = sys.intern('매도최우선호가')
+
+
+def _has_data(result):
+    """TR 응답에 데이터가 있는지 확인 (dict/DataFrame 모두 길이로 판단)"""
+    if result is None:
+        return False
+    try:
+        return len(result) > 0
+    except TypeError:
+        return True
+
+
+def _pi(data, key, default=0):
+    """TR 결과 필드를 정수로 변환 (키움의 +/- 등락 부호 제거, 값이 없으면 default)"""
+    value = data.get(key)
+    if isinstance(value, str):
+        value = value.strip().lstrip('+-')
+    if not value:
+        return default
+    return int(value)
+
+
+@functools.lru_cache(maxsize=1024)
+def _expiry_from_token(token):
+    """만기 토큰(예: "2412W4")을 만료일로 변환"""
+    year_month = token[:4]
+    week = token[-1]
+    year = int('20' + year_month[:2])
+    month = int(year_month[2:])
+    
+    # 대략적인 만료일 계산 (정확한 계산은 더 복잡함)
+    week_num = int(week)
+    return datetime(year, month, 1) + timedelta(weeks=week_num-1)
+
+
+# 옵션 종목명 패턴 (예: "K200 2412W4 270 C" -> 만기 토큰 2412W4, 행사가 270)
+_OPT_RE = re.compile(r'(\d{4})W(\d)\s+(\d+)\s+([CP])')
+
+
+@functools.lru_cache(maxsize=4096)
+def _parse_option_name(code_name):
+    """종목명에서 (만기 토큰, 행사가) 추출 - 찾지 못한 항목은 None"""
+    match = _OPT_RE.search(code_name)
+    if match:
+        year_month, week, strike, _ = match.groups()
+        return f"{year_month}W{week}", int(strike) * 100  # 행사가는 보통 100배수
+    
+    # 정규식과 다른 형식의 종목명은 토큰 단위로 확인
+    expiry_token = None
+    strike_price = None
+    for part in code_name.split():
+        if expiry_token is None and 'W' in part:
+            expiry_token = part
+        elif strike_price is None and part.isdigit():
+            strike_price = int(part) * 100
+    return expiry_token, strike_price
+
+
+class OptionBook:
+    """위클리 옵션 목록 (필드별 NumPy 배열로 보관하는 SoA 구조)
+    
+    종목 하나당 dict를 두는 대신 필드별로 연속된 배열을 두어 가격대/외가 필터를
+    배열 연산으로 처리한다. 기존 dict 형식이 필요한 곳은 as_dicts()를 사용한다.
+    """
+    
+    def __init__(self, options=()):
+        options = list(options)
+        count = len(options)
+        
+        self.codes = np.array([o['code'] for o in options], dtype=object)
+        self.names = np.array([o['name'] for o in options], dtype=object)
+        self.prices = np.fromiter((o['current_price'] for o in options),
+                                  dtype=np.int64, count=count)
+        self.strikes = np.fromiter((o['strike_price'] for o in options),
+                                   dtype=np.int64, count=count)
+        self.expiry_ts = np.fromiter((int(o['expiry_date'].timestamp()) for o in options),
+                                     dtype=np.int64, count=count)  # 유닉스 시각 (초)
+        self.is_call = np.fromiter((o['option_type'] == _CALL for o in options),
+                                   dtype=bool, count=count)
+    
+    def __len__(self):
+        return len(self.codes)
+    
+    def as_dicts(self, indices=None):
+        """기존 dict 형식의 옵션 정보 목록으로 변환"""
+        if indices is None:
+            indices = range(len(self))
+        
+        return [{
+            'code': self.codes[i],
+            'name': self.names[i],
+            'current_price': int(self.prices[i]),
+            'expiry_date': datetime.fromtimestamp(self.expiry_ts[i]),
+            'strike_price': int(self.strikes[i]),
+            'option_type': _CALL if self.is_call[i] else _PUT
+        } for i in indices]
+
 
 class KiwoomAPI:
+    _app = None  # 프로세스 전체에서 공유하는 QApplication
+    
     def __init__(self):
         self.kiwoom = None
         self.app = None
@@ -14,18 +136,64 @@ class KiwoomAPI:
         self.current_positions = {}
         self.order_history = []
         
+        # 종목명 캐시 (당일 마스터 종목명은 변하지 않으므로 날짜별 파일로 보관)
+        self._name_cache = {}
+        self._name_cache_path = os.path.join(
+            CACHE_DIR, f"master_names_{date.today():%Y%m%d}.pkl")
+        
+        # 옵션 체인 당일 디스크 캐시
+        self._option_chain_path = os.path.join(
+            CACHE_DIR, f"option_chain_{date.today():%Y%m%d}.pkl")
+        
+        # API 요청 큐 (API 객체를 만든 스레드가 요청 간격을 지키며 순서대로 처리)
+        # 다른 스레드는 큐에 넣고 기다리며, API 객체를 직접 호출하지 않는다.
+        self._tr_queue = queue.Queue()
+        self._owner_thread = threading.current_thread()
+        self._dispatch_timer = None  # Qt 이벤트 루프에서 큐를 비우는 타이머
+        self._dispatching = False
+        self._held_item = None  # 요청 간격 때문에 다음 차례로 미룬 요청
+        self._next_tr_time = 0.0  # 다음 TR을 보낼 수 있는 시각 (time.monotonic 기준)
+        
     def connect(self):
         """키움 API 연결"""
         try:
             if not QApplication.instance():
-                self.app = QApplication(sys.argv)
+                KiwoomAPI._app = QApplication(sys.argv)
+            self.app = KiwoomAPI._app
             
             self.kiwoom = Kiwoom()
-            self.kiwoom.CommConnect()
             
-            # 로그인 완료까지 대기
-            while not self.kiwoom.get_connect_state():
-                time.sleep(0.5)
+            # 로그인 이벤트(OnEventConnect) 수신 또는 타임아웃까지 이벤트 루프 실행
+            loop = QEventLoop()
+            login_errors = []  # OnEventConnect로 받은 에러 코드 (0이면 성공)
+            
+            def on_event_connect(err_code):
+                login_errors.append(err_code)
+                loop.quit()
+            
+            timer = QTimer()
+            timer.setSingleShot(True)
+            timer.timeout.connect(loop.quit)
+            
+            self.kiwoom.OnEventConnect.connect(on_event_connect)
+            try:
+                timer.start(Config.API_SETTINGS['login_timeout'] * 1000)
+                self.kiwoom.CommConnect()
+                if not self.kiwoom.get_connect_state():
+                    loop.exec_()
+            finally:
+                timer.stop()
+                self.kiwoom.OnEventConnect.disconnect(on_event_connect)
+            
+            if not self.kiwoom.get_connect_state():
+                if login_errors and login_errors[-1] != 0:
+                    print(f"키움 API 로그인 실패 (에러 코드: {login_errors[-1]})")
+                else:
+                    print("키움 API 로그인 시간 초과")
+                return False
+            
+            self._load_name_cache()
+            self._start_dispatcher()
                 
             print("키움 API 연결 완료")
             return True
@@ -34,64 +202,283 @@ class KiwoomAPI:
             print(f"키움 API 연결 실패: {e}")
             return False
     
-    def get_weekly_option_codes(self):
+    def _start_dispatcher(self):
+        """API 객체를 만든 스레드의 Qt 이벤트 루프에서 요청 큐를 비우는 타이머 시작"""
+        if self._dispatch_timer is None:
+            self._dispatch_timer = QTimer()
+            self._dispatch_timer.timeout.connect(self._dispatch_pending)
+        self._dispatch_timer.start(10)
+    
+    def _dispatch_pending(self, until=None):
+        """큐에 쌓인 요청을 Config.REQUEST_DELAY 간격으로 실행 (API 객체를 만든 스레드 전용)
+        
+        타이머에서 호출되면(until=None) 요청 간격이 남은 경우 다음 타이머까지 미루고,
+        _wait에서 호출되면 until이 끝날 때까지 간격을 기다리며 실행한다.
+        TR 응답을 기다리는 동안 이벤트 처리로 다시 호출되면 바로 반환한다.
+        """
+        if self._dispatching:
+            return
+        
+        self._dispatching = True
+        try:
+            while until is None or not until.done():
+                item, self._held_item = self._held_item, None
+                if item is None:
+                    try:
+                        item = self._tr_queue.get_nowait()
+                    except queue.Empty:
+                        return
+                
+                future, fn, args, kwargs, throttled = item
+                if future.cancelled():
+                    continue  # 취소된 요청은 TR을 보내지 않음
+                
+                if throttled:
+                    wait = self._next_tr_time - time.monotonic()
+                    if wait > 0:
+                        if until is None:
+                            self._held_item = item
+                            return
+                        time.sleep(wait)
+                
+                if not future.set_running_or_notify_cancel():
+                    continue
+                
+                try:
+                    future.set_result(fn(*args, **kwargs))
+                except Exception as e:
+                    future.set_exception(e)
+                
+                if throttled:
+                    self._next_tr_time = time.monotonic() + Config.REQUEST_DELAY
+        finally:
+            self._dispatching = False
+    
+    def _wait(self, future):
+        """요청 결과 대기
+        
+        API 객체를 만든 스레드에서는 블록하지 않고 큐를 직접 처리하고,
+        다른 스레드는 그 스레드의 타이머가 처리할 때까지 기다린다.
+        """
+        if threading.current_thread() is not self._owner_thread:
+            return future.result()
+        
+        while not future.done():
+            self._dispatch_pending(until=future)
+            if not future.done():
+                time.sleep(0.01)  # 처리 중인 요청이 끝나기를 기다림
+        return future.result()
+    
+    def _submit(self, fn, *args, **kwargs):
+        """TR 요청을 큐에 넣고 Future 반환 (결과는 _wait로 받음)"""
+        return self._enqueue(fn, args, kwargs, throttled=True)
+    
+    def _call(self, fn, *args):
+        """TR이 아닌 API 호출(종목 목록, 종목명, 주문 등)을 큐를 통해 실행하고 결과를 기다림
+        
+        API 객체는 만든 스레드에서만 사용하므로 다른 스레드에서 직접 호출하지 않는다.
+        요청 간격 대기는 하지 않는다.
+        """
+        return self._wait(self._enqueue(fn, args, {}, throttled=False))
+    
+    def _enqueue(self, fn, args, kwargs, throttled):
+        """요청을 큐에 넣고 Future 반환"""
+        future = Future()
+        self._tr_queue.put((future, fn, args, kwargs, throttled))
+        return future
+    
+    def _request(self, fn, *args, **kwargs):
+        """TR 요청을 큐를 통해 실행하고 결과를 기다림
+        
+        빈 응답(요청 제한 등)은 API_SETTINGS['retry_count']회까지
+        request_delay부터 두 배씩 늘어나는 간격으로 재시도한다.
+        """
+        retries = Config.API_SETTINGS['retry_count']
+        delay = Config.REQUEST_DELAY
+        
+        result = None
+        for attempt in range(retries):
+            result = self._wait(self._submit(fn, *args, **kwargs))
+            if _has_data(result):
+                break
+            
+            if attempt < retries - 1:
+                time.sleep(delay * (2 ** attempt))
+        
+        return result
+    
+    def _load_name_cache(self):
+        """당일 종목명 캐시 파일 로드"""
+        if not os.path.exists(self._name_cache_path):
+            return
+        
+        try:
+            with open(self._name_cache_path, 'rb') as f:
+                self._name_cache.update(pickle.load(f))
+        except Exception as e:
+            print(f"종목명 캐시 로드 실패: {e}")
+    
+    def _save_name_cache(self):
+        """종목명 캐시 파일 저장"""
+        if not self._name_cache:
+            return
+        
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(self._name_cache_path, 'wb') as f:
+                pickle.dump(self._name_cache, f)
+        except Exception as e:
+            print(f"종목명 캐시 저장 실패: {e}")
+    
+    def _name(self, code):
+        """종목명 조회 (캐시 우선)"""
+        name = self._name_cache.get(code)
+        if name is None:
+            name = self._call(self.kiwoom.get_master_code_name, code)
+            self._name_cache[code] = name
+        return name
+    
+    def _names(self, codes):
+        """여러 종목명 조회 (캐시에 없는 종목만 요청 한 번으로 조회)"""
+        missing = [code for code in codes if code not in self._name_cache]
+        if missing:
+            self._name_cache.update(self._call(self._master_code_names, missing))
+        return [self._name_cache[code] for code in codes]
+    
+    def _master_code_names(self, codes):
+        """종목명 일괄 조회 (API 객체를 만든 스레드에서 실행)"""
+        return {code: self.kiwoom.get_master_code_name(code) for code in codes}
+    
+    def get_weekly_option_codes(self, max_results=50, max_candidates=100):
+        """위클리 옵션 종목 코드 조회 (당일 캐시가 유효하면 TR 요청 없이 캐시 반환)"""
+        cached = self._load_option_chain_cache()
+        if cached is not None:
+            return cached
+        
+        return self._refresh_option_chain(max_results, max_candidates)
+    
+    def _load_option_chain_cache(self):
+        """당일 옵션 체인 캐시 로드 (장 시작 전이거나 30분 이내인 경우만)"""
+        if not os.path.exists(self._option_chain_path):
+            return None
+        
+        try:
+            age = time.time() - os.path.getmtime(self._option_chain_path)
+            before_open = datetime.now().hour < 9
+            if age > OPTION_CHAIN_MAX_AGE and not before_open:
+                return None
+            
+            with open(self._option_chain_path, 'rb') as f:
+                book = pickle.load(f)
+            return book if isinstance(book, OptionBook) else None
+        except Exception as e:
+            print(f"옵션 체인 캐시 로드 실패: {e}")
+            return None
+    
+    def _save_option_chain_cache(self, weekly_options):
+        """옵션 체인 캐시 저장"""
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            with open(self._option_chain_path, 'wb') as f:
+                pickle.dump(weekly_options, f)
+        except Exception as e:
+            print(f"옵션 체인 캐시 저장 실패: {e}")
+    
+    def _refresh_option_chain(self, max_results, max_candidates):
+        """옵션 체인 전체 조회 후 디스크 캐시 교체"""
+        weekly_options = self._scan_weekly_options(max_results, max_candidates)
+        
+        if weekly_options:
+            self._save_option_chain_cache(weekly_options)
+        
+        return weekly_options
+    
+    def _scan_weekly_options(self, max_results, max_candidates):
         """위클리 옵션 종목 코드 조회 (만기가 가장 짧은 것)"""
         try:
             # KOSPI200 옵션 종목 리스트 조회
-            option_codes = self.kiwoom.get_code_list_by_market("301")  # 옵션 시장
-            
-            weekly_options = []
-            current_date = datetime.now()
+            option_codes = self._call(self.kiwoom.get_code_list_by_market, "301")  # 옵션 시장
             
-            for code in option_codes:
-                # 종목명 조회
-                code_name = self.kiwoom.get_master_code_name(code)
-                
+            # 1단계: 종목명만으로 위클리 옵션 후보 수집 (TR 요청 없음)
+            candidates = []
+            for code, code_name in zip(option_codes, self._names(option_codes)):
                 # 위클리 옵션 판별 (W가 포함된 종목)
                 if 'W' in code_name:
-                    # 만료일 추출 (종목명에서)
-                    try:
-                        # 옵션 기본 정보 조회
-                        option_info = self.get_option_info(code)
-                        if option_info:
-                            weekly_options.append(option_info)
-                    except:
-                        continue
+                    candidates.append(self._option_meta(code, code_name))
             
             # 만기일 기준으로 정렬 (가장 짧은 것부터)
-            weekly_options.sort(key=lambda x: x['expiry_date'])
+            candidates.sort(key=lambda x: x['expiry_date'])
+            
+            # 2단계: 만기가 가까운 후보에 대해서만 현재가 조회
+            # (요청을 모두 큐에 넣고, 응답이 오는 대로 처리)
+            pending = [(meta, self._submit(self.kiwoom.get_opt10001, meta['code']))
+                       for meta in candidates[:max_candidates]]
+            
+            weekly_options = []
+            for meta, future in pending:
+                try:
+                    result = self._wait(future)
+                    if not _has_data(result):
+                        # 빈 응답(요청 제한 등)은 다른 TR과 같이 간격을 늘려가며 재요청
+                        result = self._request(self.kiwoom.get_opt10001, meta['code'])
+                    option_info = self._build_option_info(meta['code'], result, meta)
+                    if option_info:
+                        weekly_options.append(option_info)
+                except Exception as e:
+                    print(f"옵션 정보 조회 실패 ({meta['code']}): {e}")
+                    continue
+                
+                if len(weekly_options) >= max_results:
+                    break
+            
+            # 필요한 개수를 채웠으면 아직 처리되지 않은 요청은 취소
+            for _, future in pending:
+                future.cancel()
             
-            return weekly_options[:50]  # 상위 50개만 반환
+            return OptionBook(weekly_options)
             
         except Exception as e:
             print(f"위클리 옵션 조회 실패: {e}")
-            return []
+            return OptionBook()
     
-    def get_option_info(self, code):
+    def _option_meta(self, code, code_name):
+        """종목명에서 파싱한 옵션 기본 정보 (현재가 제외)"""
+        return {
+            'code': sys.intern(code),
+            'name': code_name,
+            'expiry_date': self.extract_expiry_date(code_name),
+            'strike_price': self.extract_strike_price(code_name),
+            'option_type': _CALL if 'C' in code_name else _PUT
+        }
+    
+    def get_option_info(self, code, meta=None):
         """옵션 종목 상세 정보 조회"""
         try:
             # 현재가 정보 조회
-            current_price_data = self.kiwoom.get_opt10001(code)
+            current_price_data = self._request(self.kiwoom.get_opt10001, code)
+            return self._build_option_info(code, current_price_data, meta)
+            
+        except Exception as e:
+            print(f"옵션 정보 조회 실패: {e}")
+            return None
+    
+    def _build_option_info(self, code, current_price_data, meta=None):
+        """현재가 조회 결과(opt10001)로 옵션 상세 정보 구성"""
+        try:
             if not current_price_data:
                 return None
                 
-            current_price = int(current_price_data['현재가'])
+            current_price = _pi(current_price_data, _FID_PRICE)
             
             # 가격이 0.1 이하인 종목 제외
             if current_price <= 100:  # 키움에서는 원단위이므로 100원 = 0.1원
                 return None
             
             # 종목명에서 만료일과 행사가 추출
-            code_name = self.kiwoom.get_master_code_name(code)
+            if meta is None:
+                meta = self._option_meta(code, self._name(code))
             
-            option_info = {
-                'code': code,
-                'name': code_name,
-                'current_price': current_price,
-                'expiry_date': self.extract_expiry_date(code_name),
-                'strike_price': self.extract_strike_price(code_name),
-                'option_type': 'CALL' if 'C' in code_name else 'PUT'
-            }
+            option_info = dict(meta, current_price=current_price)
             
             return option_info
             
@@ -103,19 +490,10 @@ class KiwoomAPI:
         """종목명에서 만료일 추출"""
         try:
             # 예: "K200 2412W4 270 C" -> 2024년 12월 4주차
-            parts = code_name.split()
-            for part in parts:
-                if 'W' in part:
-                    year_month = part[:4]
-                    week = part[-1]
-                    year = int('20' + year_month[:2])
-                    month = int(year_month[2:])
-                    
-                    # 대략적인 만료일 계산 (정확한 계산은 더 복잡함)
-                    week_num = int(week)
-                    expiry_date = datetime(year, month, 1) + timedelta(weeks=week_num-1)
-                    return expiry_date
-        except:
+            expiry_token, _ = _parse_option_name(code_name)
+            if expiry_token:
+                return _expiry_from_token(expiry_token)
+        except ValueError:
             pass
         
         return datetime.now() + timedelta(days=7)  # 기본값
@@ -123,69 +501,76 @@ class KiwoomAPI:
     def extract_strike_price(self, code_name):
         """종목명에서 행사가 추출"""
         try:
-            parts = code_name.split()
-            for part in parts:
-                if part.isdigit():
-                    return int(part) * 100  # 행사가는 보통 100배수
-        except:
+            _, strike_price = _parse_option_name(code_name)
+            if strike_price is not None:
+                return strike_price
+        except ValueError:
             pass
         return 0
     
     def select_trading_options(self, weekly_options):
-        """거래할 옵션 선택 (가격 0.1~0.3 범위 우선)"""
-        suitable_options = []
+        """거래할 옵션 선택 (가격 0.1~0.3 범위 우선)
         
-        for option in weekly_options:
-            price = option['current_price']
-            
-            # 0.1~0.3 범위 (100원~300원)
-            if 100 <= price <= 300:
-                suitable_options.append(option)
+        weekly_options는 OptionBook 또는 옵션 정보 dict 목록이며,
+        선택된 옵션은 dict 목록으로 반환한다.
+        """
+        book = weekly_options if isinstance(weekly_options, OptionBook) else OptionBook(weekly_options)
+        prices = book.prices
         
-        if suitable_options:
-            return suitable_options[:10]  # 상위 10개
+        # 0.1~0.3 범위 (100원~300원)
+        in_band = (prices >= 100) & (prices <= 300)
+        if in_band.any():
+            return book.as_dicts(np.flatnonzero(in_band)[:10])  # 상위 10개
         
         # 적절한 옵션이 없으면 2외가, 3외가 옵션 선택
         # KOSPI200 현재가 조회
         kospi200_price = self.get_kospi200_current_price()
         
-        otm_options = []
-        for option in weekly_options:
-            strike = option['strike_price']
-            if option['option_type'] == 'CALL':
-                # 콜옵션: 행사가가 현재가보다 높은 것 (OTM)
-                if strike > kospi200_price:
-                    otm_distance = strike - kospi200_price
-                    if 200 <= otm_distance <= 600:  # 2~3외가 범위
-                        otm_options.append(option)
-            else:
-                # 풋옵션: 행사가가 현재가보다 낮은 것 (OTM)
-                if strike < kospi200_price:
-                    otm_distance = kospi200_price - strike
-                    if 200 <= otm_distance <= 600:  # 2~3외가 범위
-                        otm_options.append(option)
+        strikes = book.strikes
+        is_call = book.is_call
+        
+        # 행사가 정렬 후 이진 탐색으로 2~3외가 범위(200~600) 구간만 추출
+        order = np.argsort(strikes, kind='stable')
+        sorted_strikes = strikes[order]
+        
+        # 콜옵션: 행사가가 현재가보다 높은 것 (OTM)
+        lo = np.searchsorted(sorted_strikes, kospi200_price + 200, side='left')
+        hi = np.searchsorted(sorted_strikes, kospi200_price + 600, side='right')
+        calls = order[lo:hi][is_call[order[lo:hi]]]
+        
+        # 풋옵션: 행사가가 현재가보다 낮은 것 (OTM)
+        lo = np.searchsorted(sorted_strikes, kospi200_price - 600, side='left')
+        hi = np.searchsorted(sorted_strikes, kospi200_price - 200, side='right')
+        puts = order[lo:hi][~is_call[order[lo:hi]]]
         
-        return otm_options[:10] if otm_options else weekly_options[:5]
+        # 원래 순서(만기일 순)를 유지
+        otm_indices = np.sort(np.concatenate((calls, puts)))[:10]
+        if otm_indices.size:
+            return book.as_dicts(otm_indices)
+        return book.as_dicts(range(min(5, len(book))))
     
     def get_kospi200_current_price(self):
         """KOSPI200 현재가 조회"""
         try:
             # KOSPI200 지수 코드
-            kospi200_data = self.kiwoom.get_opt10001("101")
+            kospi200_data = self._request(self.kiwoom.get_opt10001, "101")
             if kospi200_data:
-                return int(kospi200_data['현재가'])
-        except:
-            pass
+                kospi200_price = _pi(kospi200_data, _FID_PRICE)
+                if kospi200_price:
+                    return kospi200_price
+        except Exception as e:
+            print(f"KOSPI200 현재가 조회 실패: {e}")
         return 300  # 기본값
     
     def get_minute_data(self, code, count=200):
         """3분봉 데이터 조회"""
         try:
             # 분봉 데이터 조회 (틱범위: 3분)
-            df = self.kiwoom.get_opt10080(code=code, 
-                                        adjustment_price='1',  # 수정주가
-                                        count=count,
-                                        tick_range='3')  # 3분봉
+            df = self._request(self.kiwoom.get_opt10080,
+                               code=code,
+                               adjustment_price='1',  # 수정주가
+                               count=count,
+                               tick_range='3')  # 3분봉
             
             if df is not None and not df.empty:
                 df['date'] = pd.to_datetime(df['date'])
@@ -202,39 +587,52 @@ class KiwoomAPI:
         if len(df) < period:
             return df
         
-        df['MA'] = df['close'].rolling(window=period).mean()
-        df['STD'] = df['close'].rolling(window=period).std()
-        df['BB_Upper'] = df['MA'] + (df['STD'] * std_mult)
-        df['BB_Lower'] = df['MA'] - (df['STD'] * std_mult)
-        df['BB_Width'] = df['BB_Upper'] - df['BB_Lower']
+        close = df['close'].to_numpy(dtype=np.float64)
+        
+        # 다섯 개 지표를 하나의 버퍼에 기록 (열마다 새 배열을 만들지 않음)
+        buf = np.empty((5, len(close)))
+        ma, std, upper, lower, width = buf
+        rolling_mean_std(close, period, out=(ma, std))
+        
+        np.multiply(std, std_mult, out=width)  # 밴드 반폭을 임시로 저장
+        np.add(ma, width, out=upper)
+        np.subtract(ma, width, out=lower)
+        width *= 2  # 밴드폭 = 상단 - 하단 = 2 * 승수 * 표준편차
         
-        return df
+        return df.assign(MA=ma, STD=std, BB_Upper=upper, BB_Lower=lower,
+                         BB_Width=width)
     
     def calculate_ma_convergence(self, df, period1=5, period2=20, period3=60):
         """이동평균선 밀집도 계산"""
         if len(df) < period3:
             return df
         
-        df['MA1'] = df['close'].rolling(window=period1).mean()
-        df['MA2'] = df['close'].rolling(window=period2).mean()
-        df['MA3'] = df['close'].rolling(window=period3).mean()
+        close = df['close'].to_numpy(dtype=np.float64)
         
-        # 세 이평선 중 최대값과 최소값
-        df['MA_Max'] = df[['MA1', 'MA2', 'MA3']].max(axis=1)
-        df['MA_Min'] = df[['MA1', 'MA2', 'MA3']].min(axis=1)
-        df['MA_Convergence'] = df['MA_Max'] - df['MA_Min']
+        buf = np.empty((6, len(close)))
+        ma1, ma2, ma3, ma_max, ma_min, convergence = buf
+        rolling_mean(close, period1, out=ma1)
+        rolling_mean(close, period2, out=ma2)
+        rolling_mean(close, period3, out=ma3)
         
-        return df
+        # 세 이평선 중 최대값과 최소값 (fmax/fmin은 pandas처럼 NaN을 건너뜀)
+        np.fmax(np.fmax(ma1, ma2, out=ma_max), ma3, out=ma_max)
+        np.fmin(np.fmin(ma1, ma2, out=ma_min), ma3, out=ma_min)
+        np.subtract(ma_max, ma_min, out=convergence)
+        
+        return df.assign(MA1=ma1, MA2=ma2, MA3=ma3, MA_Max=ma_max,
+                         MA_Min=ma_min, MA_Convergence=convergence)
     
     def calculate_historical_bb_width(self, df, lookback_period=100):
         """절대 밴드폭 역사적 최저 계산"""
         if len(df) < lookback_period:
             return df
         
-        df['Historical_Min_BB_Width'] = df['BB_Width'].rolling(
-            window=lookback_period, min_periods=1).min()
+        width = df['BB_Width'].to_numpy(dtype=np.float64)
+        
+        min_width = rolling_min(width, lookback_period, min_periods=1)
         
-        return df
+        return df.assign(Historical_Min_BB_Width=min_width)
     
     def send_order(self, code, order_type, quantity, price=0):
         """주문 전송"""
@@ -248,7 +646,8 @@ class KiwoomAPI:
             else:
                 hoga_gubun = "00"  # 지정가
             
-            result = self.kiwoom.send_order(
+            result = self._call(
+                self.kiwoom.send_order,
                 "AUTO_ORDER",  # 사용자구분명
                 "0101",        # 화면번호
                 self.account,  # 계좌번호
@@ -274,43 +673,55 @@ class KiwoomAPI:
     def get_current_price(self, code):
         """현재가 조회"""
         try:
-            data = self.kiwoom.get_opt10001(code)
+            data = self._request(self.kiwoom.get_opt10001, code)
             if data:
-                return int(data['현재가'])
-        except:
-            pass
+                return _pi(data, _FID_PRICE)
+        except Exception as e:
+            print(f"현재가 조회 실패 ({code}): {e}")
         return 0
     
     def get_bid_ask_price(self, code):
         """호가 정보 조회"""
         try:
             # 호가 정보 조회
-            hoga_data = self.kiwoom.get_opt10004(code)
+            hoga_data = self._request(self.kiwoom.get_opt10004, code)
             if hoga_data:
-                bid_price = int(hoga_data.get('매수최우선호가', 0))
-                ask_price = int(hoga_data.get('매도최우선호가', 0))
+                bid_price = _pi(hoga_data, _FID_BID)
+                ask_price = _pi(hoga_data, _FID_ASK)
                 return bid_price, ask_price
-        except:
-            pass
+        except Exception as e:
+            print(f"호가 조회 실패 ({code}): {e}")
         return 0, 0
     
+    def get_quote(self, code):
+        """현재가와 최우선 호가를 한 번의 TR(opt10004)로 조회
+        
+        Returns:
+            (현재가, 매수최우선호가, 매도최우선호가) - 조회 실패 시 (0, 0, 0)
+        """
+        try:
+            hoga_data = self._request(self.kiwoom.get_opt10004, code)
+            if hoga_data:
+                current_price = _pi(hoga_data, _FID_PRICE)
+                bid_price = _pi(hoga_data, _FID_BID)
+                ask_price = _pi(hoga_data, _FID_ASK)
+                return current_price, bid_price, ask_price
+        except Exception as e:
+            print(f"시세 조회 실패 ({code}): {e}")
+        return 0, 0, 0
+    
     def smart_order(self, code, order_type, quantity, max_attempts=5):
         """스마트 주문 (스프레드 고려하여 단계적으로 호가 조정)"""
-        current_price = self.get_current_price(code)
-        bid_price, ask_price = self.get_bid_ask_price(code)
+        current_price, bid_price, ask_price = self.get_quote(code)
         
-        if order_type == "BUY":
-            # 매수: 매도호가부터 시작해서 단계적으로 올림
-            base_price = ask_price if ask_price > 0 else current_price
-        else:
-            # 매도: 매수호가부터 시작해서 단계적으로 내림
-            base_price = bid_price if bid_price > 0 else current_price
+        # 매수: 매도호가부터 단계적으로 올림 / 매도: 매수호가부터 단계적으로 내림
+        sign = 1 if order_type == "BUY" else -1
+        base_price = (ask_price if sign > 0 else bid_price) or current_price
+        step = sign * round(Config.TRADING_STRATEGY['order_settings']['price_adjustment_step']
+                            * KRW_PER_POINT)
         
         for attempt in range(max_attempts):
-            if order_type == "BUY":
-                order_price = base_price + (attempt * 5)  # 5원씩 올림
-            else:
-                order_price = base_price - (attempt * 5)  # 5원씩 내림
+            order_price = base_price + attempt * step
             
             print(f"주문 시도 {attempt+1}: {code}, {order_type}, {order_price}원")
             
@@ -328,15 +739,30 @@ class KiwoomAPI:
     def get_balance(self):
         """잔고 조회"""
         try:
-            balance_data = self.kiwoom.get_opt10075(self.account, "")
+            balance_data = self._request(self.kiwoom.get_opt10075, self.account, "")
             return balance_data
         except Exception as e:
             print(f"잔고 조회 실패: {e}")
             return {}
     
     def disconnect(self):
-        """연결 해제"""
+        """연결 해제 (connect를 호출한 스레드에서 호출)"""
+        self._save_name_cache()
+        
+        if self._dispatch_timer is not None:
+            self._dispatch_timer.stop()
+        
         if self.kiwoom:
-            self.kiwoom.CommTerminate()
+            self._call(self.kiwoom.CommTerminate)
+        
+        # 처리되지 않은 요청은 취소 (기다리는 스레드가 멈춰 있지 않도록)
+        if self._held_item is not None:
+            self._held_item[0].cancel()
+            self._held_item = None
+        while True:
+            try:
+                self._tr_queue.get_nowait()[0].cancel()
+            except queue.Empty:
+                break
         if self.app:
             self.app.quit()
\ No newline at end of file
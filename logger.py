@@ -1,128 +1,397 @@
 # logger.py - 키움증권 API 시스템 트레이딩 로그 시스템
 # ============================================================================
 
+import atexit
+import copy
 import logging
 import logging.handlers
 import os
+import queue
+import re
 import sys
+import time
 from datetime import datetime
 from typing import Optional
+
+import numpy as np
+
 from config import Config
 
-class TradingLogger:
-    """키움증권 시스템 트레이딩 전용 로거"""
-    
-    def __init__(self, name: str = "KiwoomTrading"):
-        self.name = name
-        self.logger = None
-        self._setup_logger()
-    
-    def _setup_logger(self):
-        """로거 초기 설정"""
-        # 로거 생성
-        self.logger = logging.getLogger(self.name)
-        self.logger.setLevel(getattr(logging, Config.LOGGING['log_level']))
-        
-        # 중복 핸들러 방지
-        if self.logger.handlers:
-            self.logger.handlers.clear()
-        
-        # 포매터 설정
-        formatter = self._create_formatter()
+# ============================================================================
+# 비동기 로그 처리 (모든 로거가 하나의 큐와 리스너 스레드를 공유)
+# ============================================================================
+
+_log_queue = queue.Queue(-1)
+_queue_listener = None
+
+# 최상위 로거 이름 - "KiwoomTrading.API" 같은 하위 로거는 핸들러 없이 상위로 전달
+ROOT_LOGGER_NAME = "KiwoomTrading"
+
+# 설정 파일의 로그 레벨 (모듈 로드 시 한 번만 변환)
+LEVEL = getattr(logging, Config.LOGGING['log_level'])
+_configured = False
+
+
+class _DeferredQueueHandler(logging.handlers.QueueHandler):
+    """레코드를 포매팅하지 않고 그대로 큐에 넣는 핸들러
+    
+    같은 프로세스의 리스너 스레드가 처리하므로 메시지 포매팅은 리스너에서 수행한다.
+    단, 호출한 쪽에서 나중에 바뀔 수 있는 컨테이너 인자(dict, list 등)는
+    큐에 넣기 전에 문자열로 고정한다 (로그 호출 시점의 값이 기록되도록).
+    """
+    
+    def prepare(self, record):
+        args = record.args
+        if isinstance(args, tuple):
+            if any(isinstance(arg, _MUTABLE_TYPES) for arg in args):
+                record.args = tuple(_snapshot(arg) for arg in args)
+        elif isinstance(args, dict):  # logger.info("%(key)s", {...}) 형태
+            record.args = {key: _snapshot(value) for key, value in args.items()}
         
-        # 파일 핸들러 추가
-        self._add_file_handler(formatter)
+        msg = record.msg
+        if isinstance(msg, _LazyKV) and any(isinstance(value, _MUTABLE_TYPES)
+                                            for value in msg.kwargs.values()):
+            msg.kwargs = {key: _snapshot(value) for key, value in msg.kwargs.items()}
+        return record
+
+
+# 로그 호출 이후 호출한 쪽에서 바뀔 수 있는 인자 타입
+_MUTABLE_TYPES = (dict, list, set, bytearray)
+
+
+def _snapshot(value):
+    """컨테이너 인자는 현재 내용을 문자열로 고정 (%s 포매팅 결과와 동일)"""
+    return str(value) if isinstance(value, _MUTABLE_TYPES) else value
+
+
+class BufferedRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """레코드를 메모리에 모아 두었다가 한 번에 기록하는 로테이팅 파일 핸들러
+    
+    버퍼가 flush_bytes 이상 쌓이거나 flush()가 호출되면 기록한다.
+    (리스너 스레드가 큐가 빌 때마다 flush()를 호출한다 - _FlushingQueueListener)
+    WARNING 이상 레코드는 비정상 종료 시에도 남도록 즉시 기록한다.
+    로테이션은 tell() 대신 직접 센 파일 크기로 판단한다.
+    """
+    
+    def __init__(self, filename, flush_bytes: int = 64 * 1024, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.flush_bytes = flush_bytes
+        self._buffer = []
+        self._buffered_bytes = 0
+        self._bytes_written = (os.path.getsize(self.baseFilename)
+                               if os.path.exists(self.baseFilename) else 0)
+    
+    def emit(self, record):
+        try:
+            msg = self.format(record) + self.terminator
+        except Exception:
+            self.handleError(record)
+            return
         
-        # 콘솔 핸들러 추가
-        if Config.LOGGING.get('console_output', True):
-            self._add_console_handler(formatter)
+        size = len(msg) if msg.isascii() else len(msg.encode(self.encoding or 'utf-8'))
+        if self.maxBytes > 0 and self._bytes_written + size >= self.maxBytes:
+            try:
+                self.flush()
+                self.doRollover()
+            except Exception:
+                self.handleError(record)
         
-        # 거래 전용 파일 핸들러 추가
-        self._add_trading_handler(formatter)
-    
-    def _create_formatter(self):
-        """로그 포매터 생성"""
-        return logging.Formatter(
-            fmt='%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-    
-    def _add_file_handler(self, formatter):
-        """파일 핸들러 추가 (로테이션 포함)"""
-        log_dir = "logs"
-        if not os.path.exists(log_dir):
-            os.makedirs(log_dir)
+        self._buffer.append(msg)
+        self._buffered_bytes += len(msg)
+        self._bytes_written += size
         
-        log_file = os.path.join(log_dir, Config.LOGGING['log_file'])
+        if record.levelno >= logging.WARNING or self._buffered_bytes >= self.flush_bytes:
+            try:
+                self.flush()
+            except Exception:
+                self.handleError(record)
+    
+    def flush(self):
+        """버퍼를 한 번의 write로 기록하고 필요하면 로테이션"""
+        self.acquire()
+        try:
+            if not self._buffer:
+                return
+            
+            if self.stream is None:
+                self.stream = self._open()
+            self.stream.write(''.join(self._buffer))
+            self.stream.flush()
+            self._buffer.clear()
+            self._buffered_bytes = 0
+        finally:
+            self.release()
+    
+    def doRollover(self):
+        super().doRollover()
+        self._bytes_written = 0
+    
+    def close(self):
+        try:
+            self.flush()
+        finally:
+            super().close()
+
+
+class _FlushingQueueListener(logging.handlers.QueueListener):
+    """큐가 비면 핸들러 버퍼를 기록한 뒤 다음 레코드를 기다리는 리스너
+    
+    한 번에 몰려 들어온 레코드는 한 번의 write로 기록되고,
+    별도의 타이머 스레드 없이 리스너 스레드에서 기록이 끝난다.
+    """
+    
+    def dequeue(self, block):
+        try:
+            return self.queue.get_nowait()
+        except queue.Empty:
+            pass
         
-        # 로테이팅 파일 핸들러
-        file_handler = logging.handlers.RotatingFileHandler(
-            filename=log_file,
-            maxBytes=Config.LOGGING['max_log_size'],
-            backupCount=Config.LOGGING['backup_count'],
-            encoding='utf-8'
-        )
-        file_handler.setFormatter(formatter)
-        file_handler.setLevel(getattr(logging, Config.LOGGING['log_level']))
+        self._flush_handlers()
+        return self.queue.get(block)
+    
+    def stop(self):
+        """남은 레코드를 처리한 뒤 버퍼까지 기록하고 종료"""
+        super().stop()
+        self._flush_handlers()
+    
+    def _flush_handlers(self):
+        for handler in self.handlers:
+            try:
+                handler.flush()
+            except Exception:
+                pass  # 기록 실패는 다음 레코드의 emit/flush에서 다시 시도
+
+
+def _stop_queue_listener():
+    """리스너 스레드 종료 (큐에 남은 로그를 모두 기록한 뒤 종료)"""
+    global _queue_listener
+    if _queue_listener is not None:
+        _queue_listener.stop()
+        _queue_listener = None
+
+
+atexit.register(_stop_queue_listener)
+
+# ============================================================================
+# 포매터 및 로그 메시지 템플릿 (모듈 로드 시 한 번만 생성)
+# ============================================================================
+
+class _CachedTimeFormatter(logging.Formatter):
+    """시각 문자열을 초 단위로 캐시하는 포매터
+    
+    strftime은 초가 바뀔 때만 호출하고, with_msecs이면 밀리초만 덧붙인다.
+    """
+    
+    def __init__(self, fmt, datefmt, with_msecs: bool = False):
+        super().__init__(fmt=fmt, datefmt=datefmt)
+        self.with_msecs = with_msecs
+        self._cached = (None, "")  # (초, 시각 문자열)
+    
+    def formatTime(self, record, datefmt=None):
+        second = int(record.created)
+        cached_second, text = self._cached
+        if second != cached_second:
+            text = time.strftime(datefmt or self.datefmt, self.converter(record.created))
+            self._cached = (second, text)
         
-        self.logger.addHandler(file_handler)
+        if self.with_msecs:
+            return f"{text}.{int(record.msecs):03d}"
+        return text
+
+
+_FORMATTER = _CachedTimeFormatter(
+    fmt='%(asctime)s | %(levelname)-8s | %(name)s | %(funcName)s:%(lineno)d | %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S'
+)
+
+# 거래 전용 포매터 (더 상세한 정보 포함)
+_TRADING_FORMATTER = _CachedTimeFormatter(
+    fmt='%(asctime)s | %(levelname)-8s | TRADE | %(message)s',
+    datefmt='%Y-%m-%d %H:%M:%S',
+    with_msecs=True
+)
+
+# 로그 파일 경로 (디렉터리는 모듈 로드 시 한 번만 생성)
+LOG_DIR = "logs"
+os.makedirs(LOG_DIR, exist_ok=True)
+
+_LOG_FILE = os.path.join(LOG_DIR, Config.LOGGING['log_file'])
+_TRADING_LOG_FILE = os.path.join(LOG_DIR, f"trading_{datetime.now():%Y%m%d}.log")
+
+# 거래 로그 여부 태그 (TradingLogFilter가 메시지 검사 없이 판별)
+_TRADING = {'trading': True}
+_NON_TRADING = {'trading': False}
+
+# logging의 지연 % 포매팅을 사용 (해당 레벨이 기록될 때만 문자열 생성)
+_LOGIN_SUCCESS_FMT = "API_LOGIN_SUCCESS | account=%s"
+_LOGIN_FAILED_FMT = "API_LOGIN_FAILED | account=%s"
+_MARKET_DATA_FMT = "MARKET_DATA_RECEIVED | symbol=%s | price=%s | volume=%s"
+_ORDER_REQUEST_FMT = "ORDER_REQUEST | type=%s | symbol=%s | quantity=%s | price=%s | order_id=%s"
+_ORDER_FILLED_FMT = "ORDER_FILLED | symbol=%s | quantity=%s | price=%s | order_id=%s | commission=%s"
+_ORDER_CANCELLED_FMT = "ORDER_CANCELLED | order_id=%s | reason=%s"
+_POSITION_OPENED_FMT = "POSITION_OPENED | symbol=%s | quantity=%s | entry_price=%s"
+_POSITION_CLOSED_FMT = "POSITION_CLOSED | symbol=%s | quantity=%s | exit_price=%s | pnl=%s | reason=%s"
+_STOP_LOSS_FMT = ("STOP_LOSS_TRIGGERED | symbol=%s | current_price=%s | stop_price=%s | "
+                  "loss_percent=%s")
+_MA_CROSS_FMT = ("MA_CROSS_DETECTED | symbol=%s | ma_period=%s | cross_type=%s | "
+                 "current_price=%s | ma_value=%s")
+_BOLLINGER_SQUEEZE_FMT = ("BOLLINGER_SQUEEZE_DETECTED | symbol=%s | current_bandwidth=%s | "
+                          "historical_low=%s | squeeze_ratio=%s")
+_SIGNAL_GENERATED_FMT = "SIGNAL_GENERATED | type=%s | symbol=%s | conditions=%s"
+_STRATEGY_CONDITION_FMT = ("STRATEGY_CONDITION_CHECK | condition=%s | symbol=%s | result=%s | "
+                           "details=%s")
+_RISK_CHECK_FMT = "RISK_CHECK | type=%s | passed=%s | details=%s"
+_API_ERROR_FMT = "API_ERROR | code=%s | message=%s | function=%s"
+_SYSTEM_STATUS_FMT = "SYSTEM_STATUS | status=%s | details=%s"
+_PERFORMANCE_SUMMARY_FMT = ("PERFORMANCE_SUMMARY | total_trades=%s | win_rate=%.2f%% | "
+                            "total_pnl=%s | max_drawdown=%s")
+
+
+def _create_file_handler(formatter):
+    """파일 핸들러 생성 (로테이션 포함)"""
+    # 로테이팅 파일 핸들러 (리스너 스레드에서 모아서 기록)
+    file_handler = BufferedRotatingFileHandler(
+        filename=_LOG_FILE,
+        maxBytes=Config.LOGGING['max_log_size'],
+        backupCount=Config.LOGGING['backup_count'],
+        encoding='utf-8',
+        delay=True  # 첫 기록 시점에 파일 열기
+    )
+    file_handler.setFormatter(formatter)
+    file_handler.setLevel(LEVEL)
+    
+    return file_handler
+
+
+def _create_console_handler(formatter):
+    """콘솔 핸들러 생성"""
+    console_handler = logging.StreamHandler(sys.stdout)
+    console_handler.setFormatter(formatter)
+    console_handler.setLevel(logging.INFO)  # 콘솔은 INFO 레벨 이상만
     
-    def _add_console_handler(self, formatter):
-        """콘솔 핸들러 추가"""
-        console_handler = logging.StreamHandler(sys.stdout)
-        console_handler.setFormatter(formatter)
-        console_handler.setLevel(logging.INFO)  # 콘솔은 INFO 레벨 이상만
-        
-        self.logger.addHandler(console_handler)
+    return console_handler
+
+
+def _create_trading_handler():
+    """거래 전용 로그 핸들러 생성"""
+    # 회전 없이(maxBytes=0) 버퍼링만 사용 - 레코드마다 write 하지 않음
+    trading_handler = BufferedRotatingFileHandler(
+        filename=_TRADING_LOG_FILE,
+        encoding='utf-8',
+        delay=True
+    )
+    
+    # 거래 전용 포매터 (더 상세한 정보 포함)
+    trading_handler.setFormatter(_TRADING_FORMATTER)
+    trading_handler.setLevel(logging.INFO)
+    
+    # 거래 관련 로그만 필터링
+    trading_handler.addFilter(TradingLogFilter())
+    
+    return trading_handler
+
+
+def _configure_once():
+    """최상위 로거에 큐 핸들러를 연결하고 리스너 스레드 시작 (프로세스당 한 번)
+    
+    하위 로거("KiwoomTrading.API" 등)는 핸들러 없이 최상위 로거로 전달된다.
+    """
+    global _configured, _queue_listener
+    if _configured:
+        return
+    _configured = True
+    
+    # 큐 핸들러만 연결 (실제 기록은 리스너 스레드에서 수행)
+    root = logging.getLogger(ROOT_LOGGER_NAME)
+    root.setLevel(LEVEL)
+    root.handlers.clear()
+    root.addHandler(_DeferredQueueHandler(_log_queue))
+    
+    # 파일 핸들러
+    handlers = [_create_file_handler(_FORMATTER)]
+    
+    # 콘솔 핸들러
+    if Config.LOGGING.get('console_output', True):
+        handlers.append(_create_console_handler(_FORMATTER))
+    
+    # 거래 전용 파일 핸들러
+    handlers.append(_create_trading_handler())
+    
+    _queue_listener = _FlushingQueueListener(
+        _log_queue, *handlers, respect_handler_level=True)
+    _queue_listener.start()
+
+
+
+class TradingLogger:
+    """키움증권 시스템 트레이딩 전용 로거"""
     
-    def _add_trading_handler(self, formatter):
-        """거래 전용 로그 핸들러 추가"""
-        log_dir = "logs"
-        trading_log_file = os.path.join(log_dir, f"trading_{datetime.now().strftime('%Y%m%d')}.log")
-        
-        trading_handler = logging.FileHandler(
-            filename=trading_log_file,
-            encoding='utf-8'
-        )
-        
-        # 거래 전용 포매터 (더 상세한 정보 포함)
-        trading_formatter = logging.Formatter(
-            fmt='%(asctime)s.%(msecs)03d | %(levelname)-8s | TRADE | %(message)s',
-            datefmt='%Y-%m-%d %H:%M:%S'
-        )
-        trading_handler.setFormatter(trading_formatter)
-        trading_handler.setLevel(logging.INFO)
-        
-        # 거래 관련 로그만 필터링
-        trading_handler.addFilter(TradingLogFilter())
+    # bind()로 고정한 키=값 문자열 (모든 메시지 뒤에 붙음)
+    _context = ""
+    
+    def __init__(self, name: str = ROOT_LOGGER_NAME):
+        self.name = name
+        self.logger = logging.getLogger(name)
+        _configure_once()
         
-        self.logger.addHandler(trading_handler)
+        # 최상위 로거 계층 밖의 이름은 직접 큐에 연결
+        if (name != ROOT_LOGGER_NAME and not name.startswith(ROOT_LOGGER_NAME + ".")
+                and not self.logger.handlers):
+            self.logger.setLevel(LEVEL)
+            self.logger.addHandler(_DeferredQueueHandler(_log_queue))
     
     def debug(self, message: str, **kwargs):
         """디버그 로그"""
-        self.logger.debug(self._format_message(message, **kwargs))
+        if self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(self._format_message(message, **kwargs))
     
     def info(self, message: str, **kwargs):
         """정보 로그"""
-        self.logger.info(self._format_message(message, **kwargs))
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info(self._format_message(message, **kwargs))
     
     def warning(self, message: str, **kwargs):
         """경고 로그"""
-        self.logger.warning(self._format_message(message, **kwargs))
+        if self.logger.isEnabledFor(logging.WARNING):
+            self.logger.warning(self._format_message(message, **kwargs))
     
     def error(self, message: str, **kwargs):
         """에러 로그"""
-        self.logger.error(self._format_message(message, **kwargs))
+        if self.logger.isEnabledFor(logging.ERROR):
+            self.logger.error(self._format_message(message, **kwargs))
     
     def critical(self, message: str, **kwargs):
         """치명적 에러 로그"""
-        self.logger.critical(self._format_message(message, **kwargs))
+        if self.logger.isEnabledFor(logging.CRITICAL):
+            self.logger.critical(self._format_message(message, **kwargs))
     
-    def _format_message(self, message: str, **kwargs) -> str:
-        """메시지 포맷팅"""
-        if kwargs:
-            extra_info = " | ".join([f"{k}={v}" for k, v in kwargs.items()])
-            return f"{message} | {extra_info}"
+    def bind(self, **context) -> 'TradingLogger':
+        """키=값을 고정한 로거 반환 (같은 로거와 핸들러를 공유)
+        
+        고정한 값은 bind 시점에 한 번만 문자열로 만들어 두고,
+        debug/info 등과 log_* 거래 로그 메서드의 모든 메시지 뒤에 붙인다.
+        
+        예: order_log = order_logger.bind(account=Config.ACCOUNT_NO)
+            order_log.info("ORDER_SENT", symbol=code)
+        """
+        bound = copy.copy(self)
+        rendered = " | ".join(f"{k}={v}" for k, v in context.items())
+        bound._context = f"{self._context} | {rendered}" if self._context else rendered
+        return bound
+    
+    def _log(self, level: int, fmt: str, *args, extra: dict):
+        """거래 로그 메서드 공통 기록 (bind()로 고정한 키=값을 메시지 뒤에 붙임)"""
+        if not self.logger.isEnabledFor(level):
+            return
+        if self._context:
+            fmt += " | %s"
+            args += (self._context,)
+        self.logger.log(level, fmt, *args, extra=extra, stacklevel=2)
+    
+    def _format_message(self, message: str, **kwargs):
+        """메시지 포맷팅 (키=값 목록은 실제 기록 시점에 문자열로 변환)"""
+        if kwargs or self._context:
+            return _LazyKV(message, kwargs, self._context)
         return message
     
     # ========================================================================
@@ -132,100 +401,113 @@ class TradingLogger:
     def log_login(self, success: bool, account_no: str = None):
         """로그인 로그"""
         if success:
-            self.info("API_LOGIN_SUCCESS", account=account_no or Config.ACCOUNT_NO)
+            self._log(logging.INFO, _LOGIN_SUCCESS_FMT, account_no or Config.ACCOUNT_NO,
+                      extra=_NON_TRADING)
         else:
-            self.error("API_LOGIN_FAILED", account=account_no or Config.ACCOUNT_NO)
+            self._log(logging.ERROR, _LOGIN_FAILED_FMT, account_no or Config.ACCOUNT_NO,
+                      extra=_NON_TRADING)
     
     def log_market_data(self, symbol: str, price: float, volume: int = None):
         """시장 데이터 로그"""
-        self.debug("MARKET_DATA_RECEIVED", 
-                  symbol=symbol, price=price, volume=volume)
+        self._log(logging.DEBUG, _MARKET_DATA_FMT, symbol, price, volume, extra=_NON_TRADING)
     
     def log_signal_generated(self, signal_type: str, symbol: str, conditions: dict):
         """시그널 생성 로그"""
-        self.info("SIGNAL_GENERATED", 
-                 type=signal_type, symbol=symbol, conditions=str(conditions))
+        self._log(logging.INFO, _SIGNAL_GENERATED_FMT, signal_type, symbol, conditions,
+                  extra=_TRADING)
     
     def log_order_request(self, order_type: str, symbol: str, quantity: int, 
                          price: float = None, order_id: str = None):
         """주문 요청 로그"""
-        self.info("ORDER_REQUEST", 
-                 type=order_type, symbol=symbol, quantity=quantity, 
-                 price=price, order_id=order_id)
+        self._log(logging.INFO, _ORDER_REQUEST_FMT, order_type, symbol, quantity, price, order_id,
+                  extra=_TRADING)
     
     def log_order_filled(self, symbol: str, quantity: int, price: float, 
                         order_id: str = None, commission: float = None):
         """주문 체결 로그"""
-        self.info("ORDER_FILLED", 
-                 symbol=symbol, quantity=quantity, price=price, 
-                 order_id=order_id, commission=commission)
+        self._log(logging.INFO, _ORDER_FILLED_FMT, symbol, quantity, price, order_id, commission,
+                  extra=_TRADING)
     
     def log_order_cancelled(self, order_id: str = None, reason: str = None):
         """주문 취소 로그"""
-        self.warning("ORDER_CANCELLED", order_id=order_id, reason=reason)
+        self._log(logging.WARNING, _ORDER_CANCELLED_FMT, order_id, reason, extra=_TRADING)
     
     def log_position_opened(self, symbol: str, quantity: int, entry_price: float):
         """포지션 개시 로그"""
-        self.info("POSITION_OPENED", 
-                 symbol=symbol, quantity=quantity, entry_price=entry_price)
+        self._log(logging.INFO, _POSITION_OPENED_FMT, symbol, quantity, entry_price,
+                  extra=_TRADING)
     
     def log_position_closed(self, symbol: str, quantity: int, exit_price: float, 
                            pnl: float = None, reason: str = None):
         """포지션 청산 로그"""
-        self.info("POSITION_CLOSED", 
-                 symbol=symbol, quantity=quantity, exit_price=exit_price, 
-                 pnl=pnl, reason=reason)
+        self._log(logging.INFO, _POSITION_CLOSED_FMT, symbol, quantity, exit_price, pnl, reason,
+                  extra=_TRADING)
     
     def log_stop_loss_triggered(self, symbol: str, current_price: float, 
                                stop_price: float, loss_percent: float):
         """손절매 실행 로그"""
-        self.warning("STOP_LOSS_TRIGGERED", 
-                    symbol=symbol, current_price=current_price, 
-                    stop_price=stop_price, loss_percent=loss_percent)
+        self._log(logging.WARNING, _STOP_LOSS_FMT, symbol, current_price, stop_price, loss_percent,
+                  extra=_TRADING)
     
     def log_ma_cross(self, symbol: str, ma_period: int, cross_type: str, 
                     current_price: float, ma_value: float):
         """이동평균선 교차 로그"""
-        self.info("MA_CROSS_DETECTED", 
-                 symbol=symbol, ma_period=ma_period, cross_type=cross_type,
-                 current_price=current_price, ma_value=ma_value)
+        self._log(logging.INFO, _MA_CROSS_FMT, symbol, ma_period, cross_type,
+                  current_price, ma_value, extra=_TRADING)
     
     def log_bollinger_squeeze(self, symbol: str, current_bandwidth: float, 
                              historical_low: float, squeeze_ratio: float):
         """볼린저밴드 스퀴즈 로그"""
-        self.info("BOLLINGER_SQUEEZE_DETECTED", 
-                 symbol=symbol, current_bandwidth=current_bandwidth,
-                 historical_low=historical_low, squeeze_ratio=squeeze_ratio)
+        self._log(logging.INFO, _BOLLINGER_SQUEEZE_FMT, symbol, current_bandwidth,
+                  historical_low, squeeze_ratio, extra=_TRADING)
     
     def log_strategy_condition(self, condition_name: str, symbol: str, 
                               result: bool, details: dict = None):
         """전략 조건 체크 로그"""
-        self.debug("STRATEGY_CONDITION_CHECK", 
-                  condition=condition_name, symbol=symbol, 
-                  result=result, details=str(details) if details else None)
+        self._log(logging.DEBUG, _STRATEGY_CONDITION_FMT, condition_name, symbol, result,
+                  details or None, extra=_NON_TRADING)
     
     def log_risk_check(self, check_type: str, result: bool, details: dict = None):
         """리스크 체크 로그"""
         level = logging.WARNING if not result else logging.INFO
-        self.logger.log(level, self._format_message("RISK_CHECK", 
-                       type=check_type, passed=result, details=str(details) if details else None))
+        self._log(level, _RISK_CHECK_FMT, check_type, result, details or None,
+                  extra=_NON_TRADING)
     
     def log_api_error(self, error_code: str = None, error_msg: str = None, 
                      function_name: str = None):
         """API 에러 로그"""
-        self.error("API_ERROR", 
-                  code=error_code, message=error_msg, function=function_name)
+        self._log(logging.ERROR, _API_ERROR_FMT, error_code, error_msg, function_name,
+                  extra=_NON_TRADING)
     
     def log_system_status(self, status: str, details: str = None):
         """시스템 상태 로그"""
-        self.info("SYSTEM_STATUS", status=status, details=details)
+        self._log(logging.INFO, _SYSTEM_STATUS_FMT, status, details, extra=_NON_TRADING)
     
     def log_performance_summary(self, total_trades: int, win_rate: float, 
                               total_pnl: float, max_drawdown: float):
         """성과 요약 로그"""
-        self.info("PERFORMANCE_SUMMARY", 
-                 total_trades=total_trades, win_rate=f"{win_rate:.2%}",
-                 total_pnl=total_pnl, max_drawdown=max_drawdown)
+        self._log(logging.INFO, _PERFORMANCE_SUMMARY_FMT, total_trades, win_rate * 100,
+                  total_pnl, max_drawdown, extra=_TRADING)
+
+
+_KV_FORMAT = "{0[0]}={0[1]}".format
+
+
+class _LazyKV:
+    """로그 메시지와 키=값 목록 (str() 호출 시에만 문자열을 만듦)"""
+    
+    __slots__ = ('message', 'kwargs', 'context')
+    
+    def __init__(self, message: str, kwargs: dict, context: str = ""):
+        self.message = message
+        self.kwargs = kwargs
+        self.context = context
+    
+    def __str__(self):
+        # 메시지, 고정 키=값, 키=값 목록을 한 번의 join으로 연결
+        parts = [self.message, self.context] if self.context else [self.message]
+        parts += map(_KV_FORMAT, self.kwargs.items())
+        return " | ".join(parts)
 
 
 class TradingLogFilter(logging.Filter):
@@ -235,11 +517,19 @@ class TradingLogFilter(logging.Filter):
         'ORDER_', 'POSITION_', 'SIGNAL_', 'TRADE', 'FILLED', 
         'STOP_LOSS', 'MA_CROSS', 'BOLLINGER_SQUEEZE', 'PERFORMANCE_'
     ]
+    _TRADING_RE = re.compile('|'.join(map(re.escape, TRADING_KEYWORDS)))
     
     def filter(self, record):
         """거래 관련 로그 메시지인지 확인"""
-        message = record.getMessage()
-        return any(keyword in message for keyword in self.TRADING_KEYWORDS)
+        # 거래 로그 메서드가 남긴 태그가 있으면 그대로 사용
+        trading = getattr(record, 'trading', None)
+        if trading is not None:
+            return trading
+        
+        # 태그가 없는 일반 로그는 이벤트 이름(키=값 제외)에서만 키워드 검색
+        msg = record.msg
+        event = msg.message if isinstance(msg, _LazyKV) else str(msg)
+        return self._TRADING_RE.search(event) is not None
 
 
 class PerformanceLogger:
@@ -250,7 +540,46 @@ class PerformanceLogger:
         self.trade_count = 0
         self.win_count = 0
         self.total_pnl = 0.0
-        self.trades = []
+        
+        # 거래 내역은 필드별 배열로 보관 (용량이 차면 두 배로 확장)
+        capacity = 64
+        self._sym = []
+        self._entry = np.empty(capacity, dtype=np.float64)
+        self._exit = np.empty(capacity, dtype=np.float64)
+        self._qty = np.empty(capacity, dtype=np.int32)
+        self._pnl = np.empty(capacity, dtype=np.float64)
+        self._commission = np.empty(capacity, dtype=np.float64)
+        self._ts = np.empty(capacity, dtype='datetime64[us]')
+    
+    def _grow(self):
+        """배열 용량을 두 배로 확장"""
+        capacity = 2 * len(self._pnl)
+        self._entry = np.resize(self._entry, capacity)
+        self._exit = np.resize(self._exit, capacity)
+        self._qty = np.resize(self._qty, capacity)
+        self._pnl = np.resize(self._pnl, capacity)
+        self._commission = np.resize(self._commission, capacity)
+        self._ts = np.resize(self._ts, capacity)
+    
+    @property
+    def trades(self) -> list:
+        """거래 내역을 딕셔너리 리스트로 반환 (기존 형식 호환용)"""
+        n = self.trade_count
+        return [
+            {
+                'symbol': symbol,
+                'entry_price': entry_price,
+                'exit_price': exit_price,
+                'quantity': quantity,
+                'pnl': pnl,
+                'commission': commission,
+                'timestamp': timestamp
+            }
+            for symbol, entry_price, exit_price, quantity, pnl, commission, timestamp in zip(
+                self._sym, self._entry[:n].tolist(), self._exit[:n].tolist(),
+                self._qty[:n].tolist(), self._pnl[:n].tolist(),
+                self._commission[:n].tolist(), self._ts[:n].tolist())
+        ]
     
     def log_trade_result(self, symbol: str, entry_price: float, exit_price: float, 
                         quantity: int, commission: float = 0):
@@ -258,17 +587,17 @@ class PerformanceLogger:
         pnl = (exit_price - entry_price) * quantity - commission
         is_win = pnl > 0
         
-        trade_info = {
-            'symbol': symbol,
-            'entry_price': entry_price,
-            'exit_price': exit_price,
-            'quantity': quantity,
-            'pnl': pnl,
-            'commission': commission,
-            'timestamp': datetime.now()
-        }
+        i = self.trade_count
+        if i == len(self._pnl):
+            self._grow()
         
-        self.trades.append(trade_info)
+        self._sym.append(symbol)
+        self._entry[i] = entry_price
+        self._exit[i] = exit_price
+        self._qty[i] = quantity
+        self._pnl[i] = pnl
+        self._commission[i] = commission
+        self._ts[i] = datetime.now()
         self.trade_count += 1
         self.total_pnl += pnl
         
@@ -290,21 +619,15 @@ class PerformanceLogger:
                 'max_drawdown': 0.0
             }
         
-        win_rate = self.win_count / self.trade_count
-        avg_pnl = self.total_pnl / self.trade_count
-        
-        # 최대 낙폭 계산
-        cumulative_pnl = 0
-        peak = 0
-        max_drawdown = 0
+        pnl = self._pnl[:self.trade_count]
+        win_rate = float((pnl > 0).mean())
+        avg_pnl = float(pnl.mean())
         
-        for trade in self.trades:
-            cumulative_pnl += trade['pnl']
-            if cumulative_pnl > peak:
-                peak = cumulative_pnl
-            drawdown = peak - cumulative_pnl
-            if drawdown > max_drawdown:
-                max_drawdown = drawdown
+        # 최대 낙폭 계산 (고점은 0에서 시작)
+        cumulative_pnl = np.cumsum(pnl)
+        peak = np.maximum.accumulate(cumulative_pnl)
+        np.maximum(peak, 0.0, out=peak)
+        max_drawdown = float((peak - cumulative_pnl).max())
         
         return {
             'total_trades': self.trade_count,
@@ -330,12 +653,12 @@ class PerformanceLogger:
 # ============================================================================
 
 # 메인 로거
-main_logger = TradingLogger("KiwoomTrading")
+main_logger = TradingLogger(ROOT_LOGGER_NAME)
 
-# 모듈별 로거들
-api_logger = TradingLogger("KiwoomAPI")
-strategy_logger = TradingLogger("Strategy")
-order_logger = TradingLogger("OrderManager")
+# 모듈별 로거들 (main_logger의 하위 로거로 핸들러 공유)
+api_logger = TradingLogger(f"{ROOT_LOGGER_NAME}.API")
+strategy_logger = TradingLogger(f"{ROOT_LOGGER_NAME}.Strategy")
+order_logger = TradingLogger(f"{ROOT_LOGGER_NAME}.OrderManager")
 
 # 성과 로거
 performance_logger = PerformanceLogger(main_logger)
@@ -364,6 +687,9 @@ def log_system_stop():
     # 최종 성과 요약 로그
     performance_logger.log_daily_summary()
     main_logger.log_system_status("SYSTEM_STOPPING")
+    
+    # 큐에 남은 로그를 모두 기록하고 리스너 종료
+    _stop_queue_listener()
 
 def setup_exception_logging():
     """예외 처리 로그 설정"""
@@ -401,12 +727,42 @@ def test_logger():
     main_logger.log_position_opened("KOSPI200 C 330", 10, 0.25)
     main_logger.log_position_closed("KOSPI200 C 330", 10, 0.30, pnl=12500, reason="TAKE_PROFIT")
     
+    # bind()로 고정한 키=값이 일반 로그와 거래 로그 메서드 메시지에 모두 붙는지 확인
+    capture = logging.handlers.BufferingHandler(capacity=10)
+    main_logger.logger.addHandler(capture)
+    try:
+        account_log = main_logger.bind(account="A1")
+        account_log.info("BIND_TEST", step=1)
+        account_log.log_order_filled("KOSPI200 C 330", 10, 0.25, commission=1000)
+    finally:
+        main_logger.logger.removeHandler(capture)
+    
+    info_record, filled_record = capture.buffer
+    assert info_record.getMessage() == "BIND_TEST | account=A1 | step=1"
+    assert filled_record.getMessage() == ("ORDER_FILLED | symbol=KOSPI200 C 330 | quantity=10 | "
+                                          "price=0.25 | order_id=None | commission=1000 | account=A1")
+    assert filled_record.funcName == "log_order_filled"
+    
+    # 로그 호출 뒤에 인자로 넘긴 dict를 바꿔도 호출 시점의 내용이 기록되는지 확인
+    capture = logging.handlers.BufferingHandler(capacity=10)
+    main_logger.logger.addHandler(capture)
+    try:
+        conditions = {"ma_convergence": True}
+        main_logger.log_signal_generated("BUY", "KOSPI200 C 330", conditions)
+        main_logger.info("SNAPSHOT_TEST", details=conditions)
+        conditions["ma_convergence"] = False
+    finally:
+        main_logger.logger.removeHandler(capture)
+    
+    for record in capture.buffer:
+        assert "{'ma_convergence': True}" in record.getMessage()
+    
     # 성과 로거 테스트
     performance_logger.log_trade_result("KOSPI200 C 330", 0.25, 0.30, 10, 1000)
     performance_logger.log_daily_summary()
     
     print("✅ 로거 테스트 완료")
-    print(f"로그 파일 위치: logs/{Config.LOGGING['log_file']}")
+    print(f"로그 파일 위치: {_LOG_FILE}")
 
 if __name__ == "__main__":
     test_logger()
\ No newline at end of file
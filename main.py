@@ -4,6 +4,7 @@
 import sys
 import time
 import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timedelta
 import pandas as pd
 from PyQt5.QtWidgets import QApplication
@@ -14,6 +15,11 @@ from config import Config
 from strategy import OptionTradingStrategy
 from logger import TradingLogger
 
+# 종목별 시세 조회/신호 계산용 스레드 풀
+# (실제 TR 요청은 KiwoomAPI 큐를 통해 메인(Qt) 스레드에서 하나씩 실행되고,
+#  여기서는 요청 대기와 지표 계산을 종목끼리 겹치게 함)
+_signal_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix="Signal")
+
 class AutoTrader:
     def __init__(self):
         self.config = Config()
@@ -25,10 +31,18 @@ class AutoTrader:
         self.selected_options = []
         self.positions = {}  # {종목코드: {'quantity': 수량, 'entry_price': 진입가, 'entry_time': 진입시간}}
         
+        # 종목별 3분봉 및 지표 캐시 (매 주기 최근 봉만 받아서 갱신)
+        self._bar_cache = {}        # {종목코드: 3분봉 DataFrame}
+        self._indicator_cache = {}  # {종목코드: (지표 계산에 쓴 3분봉, 지표 DataFrame)}
+        
         # 거래 시간 설정
         self.market_open_time = "09:00"
         self.market_close_time = "15:20"
         
+        # 장중 여부 판단용 (자정부터의 분)
+        self._open_minute = self._to_minutes(self.market_open_time)
+        self._close_minute = self._to_minutes(self.market_close_time)
+        
     def initialize(self):
         """시스템 초기화"""
         try:
@@ -74,48 +88,119 @@ class AutoTrader:
         except Exception as e:
             self.logger.error(f"옵션 종목 선정 중 오류: {e}")
     
+    @staticmethod
+    def _to_minutes(hhmm):
+        """"HH:MM" 문자열을 자정부터의 분으로 변환"""
+        hour, minute = map(int, hhmm.split(':'))
+        return hour * 60 + minute
+    
     def is_market_open(self):
         """장중 시간 확인"""
         now = datetime.now()
-        current_time = now.strftime("%H:%M")
         
         # 주말 제외
         if now.weekday() >= 5:  # 토요일(5), 일요일(6)
             return False
         
         # 장중 시간 확인
-        return self.market_open_time <= current_time <= self.market_close_time
+        minute = now.hour * 60 + now.minute
+        return self._open_minute <= minute <= self._close_minute
+    
+    def seconds_until_market_open(self):
+        """다음 장 시작까지 남은 초"""
+        now = datetime.now()
+        hour, minute = divmod(self._open_minute, 60)
+        open_time = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        
+        # 오늘 장 시작이 지났거나 주말이면 다음 평일 장 시작
+        if now >= open_time or now.weekday() >= 5:
+            open_time += timedelta(days=1)
+            while open_time.weekday() >= 5:
+                open_time += timedelta(days=1)
+        
+        return max(0.0, (open_time - now).total_seconds())
+    
+    def seconds_until_next_bar(self, interval=180):
+        """다음 3분봉 경계까지 남은 초 (09:00 기준으로 정렬)"""
+        now = datetime.now()
+        elapsed = (now - now.replace(hour=0, minute=0, second=0, microsecond=0)).total_seconds()
+        return interval - elapsed % interval
     
     def check_buy_signals(self):
         """매수 신호 확인"""
         if not self.selected_options:
             return
         
-        for option in self.selected_options:
-            code = option['code']
-            
-            # 이미 보유 중인 종목은 스킵
-            if code in self.positions:
-                continue
-            
+        # 이미 보유 중인 종목은 스킵하고 나머지는 동시에 조회
+        futures = {_signal_pool.submit(self.check_buy_signal, option): option
+                   for option in self.selected_options
+                   if option['code'] not in self.positions}
+        
+        # 주문은 이 스레드에서 순서대로 실행
+        for future in as_completed(futures):
+            option = futures[future]
             try:
-                # 3분봉 데이터 조회
-                df = self.kiwoom.get_minute_data(code, count=200)
-                
-                if df.empty or len(df) < 100:
-                    continue
-                
-                # 기술적 지표 계산
-                df = self.kiwoom.calculate_bollinger_bands(df)
-                df = self.kiwoom.calculate_ma_convergence(df)
-                df = self.kiwoom.calculate_historical_bb_width(df)
-                
-                # 매수 신호 확인
-                if self.strategy.check_buy_signal(df):
+                if future.result():
                     self.execute_buy_order(option)
-                    
             except Exception as e:
-                self.logger.error(f"매수 신호 확인 중 오류 ({code}): {e}")
+                self.logger.error(f"매수 신호 확인 중 오류 ({option['code']}): {e}")
+    
+    def check_buy_signal(self, option):
+        """종목 하나의 매수 신호 확인 (스레드 풀에서 실행)"""
+        code = option['code']
+        
+        # 3분봉 데이터 조회
+        bars = self.get_bars(code, count=200)
+        
+        if bars.empty or len(bars) < 100:
+            return False
+        
+        # 기술적 지표 계산 (봉이 바뀌지 않았으면 이전 결과 재사용)
+        cached = self._indicator_cache.get(code)
+        if cached is not None and cached[0] is bars:
+            df = cached[1]
+        else:
+            df = self.kiwoom.calculate_bollinger_bands(bars)
+            df = self.kiwoom.calculate_ma_convergence(df)
+            df = self.kiwoom.calculate_historical_bb_width(df)
+            self._indicator_cache[code] = (bars, df)
+        
+        # 매수 신호 확인
+        return self.strategy.check_buy_signal(df)
+    
+    def get_bars(self, code, count=200, tail=3):
+        """3분봉 조회 (캐시된 봉에 최근 tail개 봉만 받아서 이어 붙임)
+        
+        새로 받은 봉이 없으면 캐시된 DataFrame 객체를 그대로 반환한다.
+        """
+        cached = self._bar_cache.get(code)
+        
+        if cached is not None and len(cached) >= count:
+            recent = self.kiwoom.get_minute_data(code, count=tail)
+            if recent.empty:
+                return cached.iloc[-count:]
+            
+            first = recent['date'].iloc[0]
+            last_cached = cached['date'].iloc[-1]
+            
+            # 캐시와 이어지는 경우만 갱신 (공백이 있으면 전체 재조회)
+            if first <= last_cached:
+                if (recent['date'].iloc[-1] == last_cached
+                        and recent.iloc[-1].equals(cached.iloc[-1])):
+                    bars = cached  # 변경 없음
+                else:
+                    # 진행 중인 마지막 봉은 새 값으로 교체
+                    bars = pd.concat([cached[cached['date'] < first], recent],
+                                     ignore_index=True)
+                    bars = bars.iloc[-max(count, len(cached)):].reset_index(drop=True)
+                    self._bar_cache[code] = bars
+                return bars if len(bars) == count else bars.iloc[-count:]
+        
+        bars = self.kiwoom.get_minute_data(code, count=count)
+        if not bars.empty:
+            bars = bars.reset_index(drop=True)
+            self._bar_cache[code] = bars
+        return bars
     
     def execute_buy_order(self, option):
         """매수 주문 실행"""
@@ -169,45 +254,18 @@ class AutoTrader:
         """매도 신호 확인 (보유 포지션 대상)"""
         positions_to_close = []
         
-        for code, position in self.positions.items():
+        # 보유 종목별 시세 조회를 동시에 진행
+        futures = {_signal_pool.submit(self.check_sell_signal, code, position): code
+                   for code, position in self.positions.items()}
+        
+        for future in as_completed(futures):
+            code = futures[future]
             try:
-                # 현재가 조회
-                current_price = self.kiwoom.get_current_price(code)
-                
-                if current_price == 0:
-                    continue
-                
-                # 3분봉 데이터 조회
-                df = self.kiwoom.get_minute_data(code, count=50)
-                
-                if df.empty or len(df) < 10:
-                    continue
-                
-                # 10개봉 이동평균 계산
-                df['MA10'] = df['close'].rolling(window=10).mean()
-                latest_ma10 = df['MA10'].iloc[-1]
-                latest_close = df['close'].iloc[-1]
-                
-                # 매도 조건 확인
-                should_sell = False
-                sell_reason = ""
-                
-                # 1. 10개봉 이동평균선 이하로 종가가 내려온 경우
-                if latest_close < latest_ma10:
-                    should_sell = True
-                    sell_reason = "10개봉 이평선 하향 이탈"
-                
-                # 2. 10% 손실 시 손절
-                entry_price = position['entry_price']
-                loss_pct = (entry_price - current_price) / entry_price * 100
-                
-                if loss_pct >= self.config.STOP_LOSS_PCT:
-                    should_sell = True
-                    sell_reason = f"손절 ({loss_pct:.1f}% 손실)"
+                sell_reason = future.result()
                 
                 # 매도 실행
-                if should_sell:
-                    self.execute_sell_order(code, position, sell_reason)
+                if sell_reason:
+                    self.execute_sell_order(code, self.positions[code], sell_reason)
                     positions_to_close.append(code)
                     
             except Exception as e:
@@ -217,6 +275,45 @@ class AutoTrader:
         for code in positions_to_close:
             del self.positions[code]
     
+    def check_sell_signal(self, code, position):
+        """종목 하나의 매도 조건 확인 (스레드 풀에서 실행)
+        
+        Returns:
+            매도 사유 문자열 (매도하지 않으면 빈 문자열)
+        """
+        # 현재가 조회
+        current_price = self.kiwoom.get_current_price(code)
+        
+        if current_price == 0:
+            return ""
+        
+        # 3분봉 데이터 조회
+        df = self.get_bars(code, count=50)
+        
+        if df.empty or len(df) < 10:
+            return ""
+        
+        # 10개봉 이동평균 계산 (마지막 값만 필요)
+        closes = df['close'].iloc[-10:]
+        latest_ma10 = closes.mean()
+        latest_close = closes.iloc[-1]
+        
+        # 매도 조건 확인
+        sell_reason = ""
+        
+        # 1. 10개봉 이동평균선 이하로 종가가 내려온 경우
+        if latest_close < latest_ma10:
+            sell_reason = "10개봉 이평선 하향 이탈"
+        
+        # 2. 10% 손실 시 손절
+        entry_price = position['entry_price']
+        loss_pct = (entry_price - current_price) / entry_price * 100
+        
+        if loss_pct >= self.config.STOP_LOSS_PCT:
+            sell_reason = f"손절 ({loss_pct:.1f}% 손실)"
+        
+        return sell_reason
+    
     def execute_sell_order(self, code, position, reason):
         """매도 주문 실행"""
         try:
@@ -264,8 +361,9 @@ class AutoTrader:
             try:
                 # 장중 시간 확인
                 if not self.is_market_open():
-                    self.logger.info("장외 시간 - 대기 중...")
-                    time.sleep(60)  # 1분 대기
+                    wait = self.seconds_until_market_open()
+                    self.logger.info(f"장외 시간 - 장 시작까지 {wait / 60:.0f}분 대기")
+                    time.sleep(wait)
                     continue
                 
                 # 매수 신호 확인
@@ -277,8 +375,8 @@ class AutoTrader:
                 # 포지션 모니터링
                 self.monitor_positions()
                 
-                # 3분 대기 (3분봉 기준)
-                time.sleep(180)
+                # 다음 3분봉 경계까지 대기 (처리 시간만큼 밀리지 않도록)
+                time.sleep(self.seconds_until_next_bar())
                 
             except KeyboardInterrupt:
                 self.logger.info("사용자에 의한 종료 요청")
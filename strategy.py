@@ -1,7 +1,116 @@
+import math
+import time
 import numpy as np
 import pandas as pd
+from collections import deque
 from datetime import datetime, timedelta
 import logging
+from indicators import rolling_mean, rolling_mean_std, rolling_min
+
+MAX_LEN = 1024  # 종가 버퍼에 보관할 최대 봉 개수
+
+
+def _buy_signal(current_price, ma1, ma2, ma3, bandwidth, min_bandwidth):
+    """매수 조건 판단 (최신 지표 값만 받는 순수 함수, 봉마다 한 번 호출)"""
+    # 조건 1: 이동평균선 밀집도가 낮을 때 (임계값은 현재가의 1%로 설정)
+    condition1 = max(ma1, ma2, ma3) - min(ma1, ma2, ma3) <= current_price * 0.01
+    
+    # 조건 2: 현재 밴드폭이 역사적 최저 근처일 때 (110% 이내)
+    condition2 = bandwidth <= min_bandwidth * 1.10
+    
+    return condition1 and condition2
+
+
+class RollingMean:
+    """고정 기간 이동평균 (새 값이 들어올 때마다 O(1) 갱신)"""
+    
+    def __init__(self, window):
+        self.window = window
+        self.reset()
+    
+    def reset(self):
+        self._values = deque()
+        self._sum = 0.0
+        self._count = 0
+    
+    def update(self, value):
+        self._values.append(value)
+        self._sum += value
+        if len(self._values) > self.window:
+            self._sum -= self._values.popleft()
+        
+        # 덧셈/뺄셈 누적 오차가 쌓이지 않도록 주기적으로 다시 합산
+        self._count += 1
+        if self._count % self.window == 0:
+            self._sum = math.fsum(self._values)
+    
+    @property
+    def ready(self):
+        return len(self._values) == self.window
+    
+    @property
+    def mean(self):
+        """이동평균 (데이터가 기간보다 적으면 None)"""
+        return self._sum / self.window if self.ready else None
+
+
+class RollingStd(RollingMean):
+    """고정 기간 이동평균과 표본 표준편차(ddof=1)를 함께 O(1) 갱신"""
+    
+    def reset(self):
+        super().reset()
+        self._sumsq = 0.0
+        self._same_run = 0  # 같은 값이 연속된 개수 (구간 전체가 같으면 표준편차 0)
+    
+    def update(self, value):
+        self._same_run = self._same_run + 1 if self._values and self._values[-1] == value else 1
+        self._sumsq += value * value
+        if len(self._values) == self.window:
+            old = self._values[0]
+            self._sumsq -= old * old
+        super().update(value)
+        if self._count % self.window == 0:
+            self._sumsq = math.fsum(v * v for v in self._values)
+    
+    @property
+    def std(self):
+        """표본 표준편차 (데이터가 기간보다 적으면 None)"""
+        if not self.ready:
+            return None
+        if self._same_run >= self.window:
+            return 0.0
+        n = self.window
+        var = (self._sumsq - self._sum * self._sum / n) / (n - 1)
+        return math.sqrt(var) if var > 0 else 0.0
+
+
+class RollingMin:
+    """고정 기간 이동 최소값 (단조 증가 deque로 분할 상환 O(1) 갱신)"""
+    
+    def __init__(self, window):
+        self.window = window
+        self.reset()
+    
+    def reset(self):
+        self._deque = deque()  # (순번, 값) - 값이 오름차순으로 유지됨
+        self._count = 0
+    
+    def update(self, value):
+        dq = self._deque
+        while dq and dq[-1][1] >= value:
+            dq.pop()
+        dq.append((self._count, value))
+        
+        # 기간을 벗어난 가장 오래된 최소값 제거
+        if dq[0][0] <= self._count - self.window:
+            dq.popleft()
+        self._count += 1
+    
+    @property
+    def min(self):
+        """이동 최소값 (데이터가 기간보다 적으면 None)"""
+        return self._deque[0][1] if self._count >= self.window else None
+
 
 class OptionTradingStrategy:
     def __init__(self):
@@ -20,6 +129,16 @@ class OptionTradingStrategy:
             'lookback_period': 100  # 역사적 최저 밴드폭 비교 기간
         }
         
+        # 자주 쓰는 파라미터는 속성으로 풀어 둠 (매 봉마다 dict 조회를 하지 않음)
+        self._p1 = self.ma_convergence_params['period1']
+        self._p2 = self.ma_convergence_params['period2']
+        self._p3 = self.ma_convergence_params['period3']
+        self._bb_period = self.bollinger_params['period']
+        self._bb_mult = self.bollinger_params['mult']
+        self._bb_lb = self.bollinger_params['lookback_period']
+        self._min_bars = max(self._p3, self._bb_lb)  # 매수 조건 확인에 필요한 최소 봉 개수
+        self._bw_factor = 2 * self._bb_mult           # 밴드폭 = 2 * 승수 * 표준편차
+        
         # 매매 관련 파라미터
         self.exit_ma_period = 10    # 청산용 이동평균 기간
         self.stop_loss_rate = 0.10  # 10% 손절
@@ -28,104 +147,286 @@ class OptionTradingStrategy:
         # 상태 변수
         self.position = None
         self.entry_price = 0
-        self.entry_time = None
-        self.price_data = pd.DataFrame()
+        self.entry_time_ns = None  # 진입 시각 (time.time_ns() 값, 상태 조회 시 datetime으로 변환)
+        self._price_frame = pd.DataFrame()
+        
+        # 최근 종가 버퍼 (앞에서부터 _buf_len개가 유효, 가득 차면 오래된 봉부터 버림)
+        # (float32로 줄이면 종가와 청산 이동평균이 같은 경우의 판별이 어긋나므로 float64 유지)
+        self._close_buf = np.empty(MAX_LEN, dtype=np.float64)
+        self._buf_len = 0
+        self._close_np = self._close_buf[:0]  # 유효 구간 뷰 (update_price_data에서 갱신)
+        
+        # calculate_* 중간 결과용 작업 배열 (반환하지 않는 배열만, 호출마다 재사용)
+        self._scratch = {name: np.empty(MAX_LEN, dtype=np.float64)
+                         for name in ('max_ma', 'min_ma', 'sma')}
+        
+        # 매수 조건용 지표 상태 (새 봉만 반영해서 갱신)
+        self._ma1 = RollingMean(self._p1)
+        self._ma2 = RollingMean(self._p2)
+        self._ma3 = RollingMean(self._p3)
+        self._bb = RollingStd(self._bb_period)
+        self._bw_min = RollingMin(self._bb_lb)
+        self._ingested_index = None  # 지표에 반영한 봉의 인덱스
+        self._ingested_first_date = None  # 지표에 반영한 첫 봉의 'date' 값
+        self._ingested_last_date = None  # 지표에 반영한 마지막 봉의 'date' 값
+        
+        # 최신 지표 값에 영향을 주는 최근 봉 개수 (처음부터 계산할 때 이 구간만 반영)
+        self._tail_len = max(self._p3, self._bb_lb + self._bb_period - 1)
+        
+        # 같은 봉에서 반복 호출될 때 재사용할 매수 조건 결과
+        self._last_signal_key = None
+        self._last_signal_cache = None
+        
+        # 최신 지표 값 (데이터 부족 시 None)
+        self.ma1_last = self.ma2_last = self.ma3_last = None
+        self.sma_last = self.std_last = None
+        self.bandwidth_last = self.min_bandwidth_last = None
         
+    @property
+    def price_data(self):
+        """마지막으로 전달받은 가격 데이터 (DataFrame)"""
+        return self._price_frame
+    
+    @price_data.setter
+    def price_data(self, price_data):
+        self.update_price_data(price_data)
+    
     def update_price_data(self, price_data):
-        """가격 데이터 업데이트 (3분봉)"""
-        self.price_data = price_data
+        """가격 데이터 업데이트 (3분봉)
+        
+        이전 데이터 뒤에 봉이 추가된 경우 새 봉만 종가 버퍼와 지표에 반영하고,
+        그 외(처음 호출, 마지막 봉 변경, 다른 구간)에는 처음부터 다시 계산한다.
+        'date' 열이 있으면 인덱스가 새로 매겨진 재조회 구간(같은 개수로 밀린 구간)도
+        이전 봉과 이어지는지 확인해서 새 봉만 반영한다.
+        """
+        self._price_frame = price_data
+        self._last_signal_key = None
+        
+        n = len(price_data)
+        if n == 0:
+            self._reset_indicators()
+            return
+        
+        closes = price_data['close'].to_numpy(dtype=np.float64)
+        index = price_data.index
+        
+        dates = price_data['date'].to_numpy() if 'date' in price_data.columns else None
+        
+        # 이전에 반영한 봉들에 이어지는 새 봉만 반영 (이어지지 않으면 처음부터)
+        start = self._continuation_start(index, dates, closes)
+        if start is not None:
+            self._append_closes(closes[start:])
+        else:
+            self._reset_indicators()
+            self._append_closes(closes)
+            start = max(0, n - self._tail_len)
+        
+        # 최근 종가 읽기용 뷰 (pandas 인덱싱을 거치지 않음, 전달받은 봉 개수까지만)
+        self._close_np = self._close_buf[max(0, self._buf_len - n):self._buf_len]
+        
+        for close in closes[start:].tolist():
+            self._ingest(close)
+        
+        self._ingested_index = index
+        self._ingested_first_date = None if dates is None else dates[0]
+        self._ingested_last_date = None if dates is None else dates[-1]
+        
+        # 최신 지표 값 갱신
+        self.ma1_last = self._ma1.mean
+        self.ma2_last = self._ma2.mean
+        self.ma3_last = self._ma3.mean
+        self.sma_last = self._bb.mean
+        self.std_last = self._bb.std
+        self.min_bandwidth_last = self._bw_min.min
+    
+    def _continuation_start(self, index, dates, closes):
+        """새 데이터에서 아직 반영하지 않은 첫 봉의 위치 (이전 봉과 이어지지 않으면 None)"""
+        if self._ingested_index is None:
+            return None
+        
+        # 이전에 반영한 봉들이 그대로 앞부분에 있는 경우 (같은 인덱스로 봉 추가)
+        start = len(self._ingested_index)
+        if (start <= len(index)
+                and index[:start].equals(self._ingested_index)
+                and self._matches_buffer(closes[:start])):
+            return start
+        
+        # 재조회로 인덱스가 새로 매겨진 경우: 마지막으로 반영한 봉의 시각 위치 탐색
+        if dates is None or self._ingested_last_date is None:
+            return None
+        
+        # 이전보다 앞쪽 봉이 더 많은 구간은 반영하지 않은 과거가 있으므로 처음부터 계산
+        if dates[0] < self._ingested_first_date:
+            return None
+        
+        # 앞쪽 봉이 빠졌는데 지표 계산 길이보다 짧으면 빠진 봉이 상태에 남으므로 처음부터 계산
+        if dates[0] > self._ingested_first_date and len(dates) < self._tail_len:
+            return None
+        
+        start = int(np.searchsorted(dates, self._ingested_last_date, side='right'))
+        if (0 < start <= len(self._ingested_index)
+                and dates[start - 1] == self._ingested_last_date
+                and self._matches_buffer(closes[:start])):
+            return start
+        return None
+    
+    def _matches_buffer(self, closes):
+        """closes의 끝부분이 종가 버퍼의 끝부분과 같은지 (겹치는 구간만 비교)"""
+        m = min(len(closes), self._buf_len)
+        return m > 0 and np.array_equal(closes[len(closes) - m:],
+                                        self._close_buf[self._buf_len - m:self._buf_len])
+    
+    def _reset_indicators(self):
+        """지표 상태 초기화"""
+        for state in (self._ma1, self._ma2, self._ma3, self._bb, self._bw_min):
+            state.reset()
+        self._ingested_index = None
+        self._ingested_first_date = None
+        self._ingested_last_date = None
+        self._buf_len = 0
+        self._close_np = self._close_buf[:0]
+        self.ma1_last = self.ma2_last = self.ma3_last = None
+        self.sma_last = self.std_last = None
+        self.bandwidth_last = self.min_bandwidth_last = None
+    
+    def _append_closes(self, closes):
+        """종가 버퍼 뒤에 새 종가 추가 (넘치면 오래된 종가부터 버림)"""
+        k = len(closes)
+        if k >= MAX_LEN:
+            self._close_buf[:] = closes[-MAX_LEN:]
+            self._buf_len = MAX_LEN
+            return
+        
+        if self._buf_len + k > MAX_LEN:
+            keep = MAX_LEN - k
+            self._close_buf[:keep] = self._close_buf[self._buf_len - keep:self._buf_len]
+            self._buf_len = keep
+        
+        self._close_buf[self._buf_len:self._buf_len + k] = closes
+        self._buf_len += k
+    
+    def _ingest(self, close):
+        """종가 하나를 지표 상태에 반영"""
+        self._ma1.update(close)
+        self._ma2.update(close)
+        self._ma3.update(close)
+        self._bb.update(close)
+        
+        # 밴드폭 = 상단 - 하단 = 2 * 승수 * 표준편차
+        std = self._bb.std
+        if std is not None:
+            self.bandwidth_last = self._bw_factor * std
+            self._bw_min.update(self.bandwidth_last)
         
     def calculate_ma_convergence(self, prices):
         """이동평균선 밀집도 계산"""
-        if len(prices) < self.ma_convergence_params['period3']:
+        if len(prices) < self._p3:
             return None, None, None, None
             
-        # 각 기간별 이동평균 계산
-        ma1 = prices.rolling(window=self.ma_convergence_params['period1']).mean()
-        ma2 = prices.rolling(window=self.ma_convergence_params['period2']).mean()
-        ma3 = prices.rolling(window=self.ma_convergence_params['period3']).mean()
+        values = np.asarray(prices, dtype=np.float64)
         
-        # 최대값, 최소값 계산
-        max_ma = np.maximum(ma1, np.maximum(ma2, ma3))
-        min_ma = np.minimum(ma1, np.minimum(ma2, ma3))
+        # 각 기간별 이동평균을 (3, N) 배열의 행에 계산
+        stack = np.empty((3, len(values)))
+        ma1, ma2, ma3 = stack
+        rolling_mean(values, self._p1, out=ma1)
+        rolling_mean(values, self._p2, out=ma2)
+        rolling_mean(values, self._p3, out=ma3)
+        
+        # 최대값, 최소값 계산 (열 방향 한 번의 축소 연산, 작업 배열에 기록)
+        max_ma = stack.max(axis=0, out=self._scratch_view('max_ma', len(values)))
+        min_ma = stack.min(axis=0, out=self._scratch_view('min_ma', len(values)))
         
         # 밀집도 계산 (최대값 - 최소값)
-        convergence_value = max_ma - min_ma
+        convergence_value = np.subtract(max_ma, min_ma)
         
-        return ma1, ma2, ma3, convergence_value
+        return self._as_series(prices, ma1, ma2, ma3, convergence_value)
     
     def calculate_bollinger_bands(self, prices):
         """볼린저밴드 및 절대 밴드폭 계산"""
-        if len(prices) < self.bollinger_params['period']:
+        if len(prices) < self._bb_period:
             return None, None, None, None
             
-        # 볼린저밴드 계산
-        sma = prices.rolling(window=self.bollinger_params['period']).mean()
-        std = prices.rolling(window=self.bollinger_params['period']).std()
+        values = np.asarray(prices, dtype=np.float64)
+        
+        # 볼린저밴드 계산 (평균과 표준편차를 한 번의 누적합으로)
+        sma, std = rolling_mean_std(values, self._bb_period,
+                                    out=(self._scratch_view('sma', len(values)),
+                                         np.empty(len(values))))
         
-        upper_band = sma + (std * self.bollinger_params['mult'])
-        lower_band = sma - (std * self.bollinger_params['mult'])
+        # 표준편차 배열을 밴드 반폭으로 재사용
+        half_width = np.multiply(std, self._bb_mult, out=std)
+        upper_band = sma + half_width
+        lower_band = sma - half_width
         
-        # 현재 절대 밴드폭
-        current_bandwidth = upper_band - lower_band
+        # 현재 절대 밴드폭 (상단 - 하단 = 2 * 승수 * 표준편차, 상/하단을 다시 읽지 않음)
+        current_bandwidth = np.multiply(half_width, 2, out=half_width)
         
         # 과거 기간 중 최저 밴드폭
-        if len(current_bandwidth) >= self.bollinger_params['lookback_period']:
-            historical_lowest = current_bandwidth.rolling(
-                window=self.bollinger_params['lookback_period']
-            ).min()
+        if len(current_bandwidth) >= self._bb_lb:
+            historical_lowest = rolling_min(current_bandwidth, self._bb_lb)
         else:
             historical_lowest = None
             
-        return upper_band, lower_band, current_bandwidth, historical_lowest
+        return self._as_series(prices, upper_band, lower_band, current_bandwidth,
+                               historical_lowest)
+    
+    def _scratch_view(self, name, n):
+        """작업 배열의 앞 n개 구간 (MAX_LEN보다 길면 새로 할당)"""
+        if n > MAX_LEN:
+            return np.empty(n, dtype=np.float64)
+        return self._scratch[name][:n]
+    
+    @staticmethod
+    def _as_series(prices, *arrays):
+        """입력이 Series이면 결과 배열도 같은 인덱스의 Series로 반환"""
+        if not isinstance(prices, pd.Series):
+            return arrays
+        return tuple(None if a is None else pd.Series(a, index=prices.index)
+                     for a in arrays)
     
     def check_buy_conditions(self):
         """매수 조건 확인"""
-        if len(self.price_data) < max(self.ma_convergence_params['period3'], 
-                                     self.bollinger_params['lookback_period']):
+        if len(self.price_data) < self._min_bars:
             return False
-            
-        prices = self.price_data['close']
         
-        # 1. 이동평균선 밀집도 계산
-        ma1, ma2, ma3, convergence = self.calculate_ma_convergence(prices)
-        if convergence is None:
-            return False
-            
-        # 2. 볼린저밴드 및 밴드폭 계산
-        upper_b, lower_b, current_bw, historical_lowest_bw = self.calculate_bollinger_bands(prices)
-        if current_bw is None or historical_lowest_bw is None:
-            return False
-            
-        # 현재 값들
-        current_convergence = convergence.iloc[-1]
-        current_bandwidth = current_bw.iloc[-1]
-        historical_min_bandwidth = historical_lowest_bw.iloc[-1]
-        
-        # 매수 조건 확인
-        # 조건 1: 이동평균선 밀집도가 낮을 때 (임계값은 현재가의 1%로 설정)
-        current_price = prices.iloc[-1]
-        convergence_threshold = current_price * 0.01
+        # 같은 봉에서 이미 확인했으면 이전 결과 반환
+        key = (len(self.price_data), self.price_data.index[-1])
+        if key == self._last_signal_key:
+            return self._last_signal_cache
         
-        condition1 = current_convergence <= convergence_threshold
+        result = self._evaluate_buy_conditions()
+        self._last_signal_key = key
+        self._last_signal_cache = result
+        return result
+    
+    def _evaluate_buy_conditions(self):
+        """최신 지표 값으로 매수 조건 판단"""
+        # update_price_data에서 갱신한 최신 지표 값 사용 (데이터 부족 시 None)
+        mas = (self.ma1_last, self.ma2_last, self.ma3_last)
+        current_bandwidth = self.bandwidth_last
+        historical_min_bandwidth = self.min_bandwidth_last
+        if None in mas or current_bandwidth is None or historical_min_bandwidth is None:
+            return False
         
-        # 조건 2: 현재 밴드폭이 역사적 최저 근처일 때 (110% 이내)
-        condition2 = current_bandwidth <= (historical_min_bandwidth * 1.10)
+        current_price = self._close_np[-1]
         
-        self.logger.info(f"매수 조건 확인 - 밀집도: {current_convergence:.4f} (임계값: {convergence_threshold:.4f}), "
-                        f"현재 밴드폭: {current_bandwidth:.4f}, 역사적 최저: {historical_min_bandwidth:.4f}")
+        # INFO가 꺼져 있으면 매 봉마다 메시지를 만들지 않음
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("매수 조건 확인 - 밀집도: %.4f (임계값: %.4f), 현재 밴드폭: %.4f, 역사적 최저: %.4f",
+                             max(mas) - min(mas), current_price * 0.01,
+                             current_bandwidth, historical_min_bandwidth)
         
-        return condition1 and condition2
+        return _buy_signal(current_price, *mas, current_bandwidth, historical_min_bandwidth)
     
     def check_sell_conditions(self):
         """매도 조건 확인"""
         if self.position is None:
             return False, "포지션 없음"
             
-        if len(self.price_data) < self.exit_ma_period:
+        if len(self._close_np) < self.exit_ma_period:
             return False, "데이터 부족"
             
-        current_price = self.price_data['close'].iloc[-1]
+        current_price = self._close_np[-1]
         
         # 조건 1: 10% 손절
         loss_rate = (self.entry_price - current_price) / self.entry_price
@@ -133,8 +434,11 @@ class OptionTradingStrategy:
             return True, f"손절 - 손실률: {loss_rate:.2%}"
         
         # 조건 2: 10봉 이동평균 하향 돌파
-        exit_ma = self.price_data['close'].rolling(window=self.exit_ma_period).mean()
-        current_ma = exit_ma.iloc[-1]
+        # 마지막 이동평균 값만 필요하므로 최근 exit_ma_period개 종가만 평균
+        # (두 번째 패스로 반올림 오차를 보정해 종가와 평균이 같은 경우를 정확히 판별)
+        tail = self._close_np[-self.exit_ma_period:]
+        current_ma = tail.mean()
+        current_ma += (tail - current_ma).mean()
         
         if current_price < current_ma:
             profit_rate = (current_price - self.entry_price) / self.entry_price
@@ -146,23 +450,36 @@ class OptionTradingStrategy:
         """옵션 가격이 거래 범위 내인지 확인"""
         return self.price_range[0] <= price <= self.price_range[1]
     
+    def valid_option_price_mask(self, prices):
+        """여러 옵션 가격이 거래 범위 내인지 한 번에 확인 (is_valid_option_price의 배열 버전)
+        
+        옵션 체인 전체를 종목별 호출 없이 걸러낼 때 사용하며, bool 배열을 반환한다.
+        """
+        lo, hi = self.price_range
+        prices = np.asarray(prices, dtype=np.float64)
+        return (prices >= lo) & (prices <= hi)
+    
     def enter_position(self, option_code, current_price):
         """포지션 진입"""
         if not self.is_valid_option_price(current_price):
-            self.logger.warning(f"옵션 가격 {current_price}이 거래 범위 {self.price_range} 밖임")
+            self.logger.warning("옵션 가격 %s이 거래 범위 %s 밖임", current_price, self.price_range)
             return False
             
+        # 진입 시각은 한 번만 읽어서 정수(ns)로 저장
+        entry_ns = time.time_ns()
+        
         self.position = {
             'code': option_code,
             'entry_price': current_price,
-            'entry_time': datetime.now(),
+            'entry_time_ns': entry_ns,
             'quantity': 1  # 기본 수량
         }
         
         self.entry_price = current_price
-        self.entry_time = datetime.now()
+        self.entry_time_ns = entry_ns
         
-        self.logger.info(f"포지션 진입 - 종목: {option_code}, 가격: {current_price}")
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("포지션 진입 - 종목: %s, 가격: %s", option_code, current_price)
         return True
     
     def exit_position(self, reason=""):
@@ -170,17 +487,18 @@ class OptionTradingStrategy:
         if self.position is None:
             return False
             
-        current_price = self.price_data['close'].iloc[-1]
+        current_price = self._close_np[-1]
         profit_loss = current_price - self.entry_price
         profit_rate = profit_loss / self.entry_price
         
-        self.logger.info(f"포지션 청산 - 종목: {self.position['code']}, "
-                        f"진입가: {self.entry_price}, 청산가: {current_price}, "
-                        f"손익: {profit_loss:.2f} ({profit_rate:.2%}), 사유: {reason}")
+        if self.logger.isEnabledFor(logging.INFO):
+            self.logger.info("포지션 청산 - 종목: %s, 진입가: %s, 청산가: %s, 손익: %.2f (%.2f%%), 사유: %s",
+                             self.position['code'], self.entry_price, current_price,
+                             profit_loss, profit_rate * 100, reason)
         
         self.position = None
         self.entry_price = 0
-        self.entry_time = None
+        self.entry_time_ns = None
         
         return True
     
@@ -220,20 +538,76 @@ class OptionTradingStrategy:
             # 스프레드가 적당하면 현재가로 주문
             return current_price
     
+    def calculate_order_prices(self, current_prices, bid_prices, ask_prices, order_type):
+        """여러 종목의 주문 가격을 한 번에 계산 (calculate_order_price의 배열 버전)
+        
+        종목별 분기 없이 두 후보 가격을 모두 계산한 뒤 np.where로 선택한다.
+        """
+        current_prices = np.asarray(current_prices, dtype=np.float64)
+        bid_prices = np.asarray(bid_prices, dtype=np.float64)
+        ask_prices = np.asarray(ask_prices, dtype=np.float64)
+        
+        # 스프레드가 과도하게 큰 경우 (현재가의 5% 이상)
+        wide = (ask_prices - bid_prices) > current_prices * 0.05
+        
+        if order_type == "BUY":
+            # 매수 시 매도호가에서 한 단계 내려서 주문
+            quoted = np.maximum(bid_prices, ask_prices - 0.01)
+        else:  # SELL
+            # 매도 시 매수호가에서 한 단계 올려서 주문
+            quoted = np.minimum(ask_prices, bid_prices + 0.01)
+        
+        return np.where(wide, quoted, current_prices)
+    
     def get_strategy_status(self):
         """전략 상태 반환"""
         status = {
             'position': self.position,
             'entry_price': self.entry_price,
-            'entry_time': self.entry_time,
+            'entry_time': (None if self.entry_time_ns is None
+                           else datetime.fromtimestamp(self.entry_time_ns / 1e9)),
             'data_length': len(self.price_data) if not self.price_data.empty else 0
         }
         
         if self.position and not self.price_data.empty:
-            current_price = self.price_data['close'].iloc[-1]
+            current_price = self._close_np[-1]
             unrealized_pnl = current_price - self.entry_price
             unrealized_rate = unrealized_pnl / self.entry_price
             status['unrealized_pnl'] = unrealized_pnl
             status['unrealized_rate'] = unrealized_rate
             
-        return status
\ No newline at end of file
+        return status
+
+
+def test_price_data_continuation():
+    """재조회 구간이 이전보다 앞쪽까지 길어지거나 짧게 밀린 경우 새로 계산한 결과와 비교"""
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame({'date': pd.date_range('2024-01-02 09:00', periods=300, freq='3min'),
+                          'close': 0.2 + np.cumsum(rng.normal(0, 0.002, 300))})
+    
+    cases = [
+        (frame.iloc[150:200], frame.iloc[0:200]),      # 같은 마지막 봉, 앞쪽 봉이 더 많음
+        (frame.iloc[0:200], frame.iloc[120:201]),      # 한 봉 추가, 계산 길이보다 짧게 밀림
+        (frame.iloc[0:200], frame.iloc[3:203]),        # 같은 개수로 밀림
+    ]
+    for before, after in cases:
+        strategy = OptionTradingStrategy()
+        strategy.update_price_data(before.reset_index(drop=True))
+        strategy.update_price_data(after.reset_index(drop=True))
+        
+        fresh = OptionTradingStrategy()
+        fresh.update_price_data(after.reset_index(drop=True))
+        
+        assert len(strategy._close_np) == len(after)
+        assert np.array_equal(strategy._close_np, fresh._close_np)
+        for name in ('ma1_last', 'ma2_last', 'ma3_last', 'sma_last', 'std_last',
+                     'min_bandwidth_last'):
+            got, expected = getattr(strategy, name), getattr(fresh, name)
+            assert (got is None) == (expected is None), name
+            assert got is None or math.isclose(got, expected, rel_tol=1e-9), name
+    
+    print("✅ 가격 데이터 이어받기 테스트 통과")
+
+
+if __name__ == "__main__":
+    test_price_data_continuation()